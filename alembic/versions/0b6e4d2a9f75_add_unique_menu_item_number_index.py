@@ -0,0 +1,52 @@
+"""add_unique_menu_item_number_index
+
+Revision ID: 0b6e4d2a9f75
+Revises: f5c2b8e41d93
+Create Date: 2026-10-17 16:41:09.663128
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b6e4d2a9f75'
+down_revision: Union[str, Sequence[str], None] = 'f5c2b8e41d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Resolve existing duplicates first: the most recently updated active item keeps
+    # the number, the others have it cleared (which takes them out of the index)
+    op.execute(
+        """
+        UPDATE menu_items SET number = NULL
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY agent_id, number
+                    ORDER BY updated_at DESC NULLS LAST, created_at DESC NULLS LAST, id
+                ) AS duplicate_rank
+                FROM menu_items
+                WHERE active AND number IS NOT NULL AND number <> ''
+            ) ranked
+            WHERE duplicate_rank > 1
+        )
+        """
+    )
+    op.create_index(
+        'ux_menu_items_agent_number',
+        'menu_items',
+        ['agent_id', 'number'],
+        unique=True,
+        postgresql_where=sa.text("active AND number IS NOT NULL AND number <> ''"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_menu_items_agent_number', table_name='menu_items')
@@ -0,0 +1,43 @@
+"""cover_conversation_statistics_columns
+
+Revision ID: 2f8d6b4c1e57
+Revises: d3b7a5e9c210
+Create Date: 2026-10-17 19:04:48.227301
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f8d6b4c1e57'
+down_revision: Union[str, Sequence[str], None] = 'd3b7a5e9c210'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index('ix_conversations_agent_created', table_name='conversations')
+    op.create_index(
+        'ix_conversations_agent_created',
+        'conversations',
+        ['agent_id', sa.text('created_at DESC')],
+        unique=False,
+        postgresql_where=sa.text('active'),
+        postgresql_include=['caller_phone', 'conversation_type', 'duration_seconds'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_conversations_agent_created', table_name='conversations')
+    op.create_index(
+        'ix_conversations_agent_created',
+        'conversations',
+        ['agent_id', sa.text('created_at DESC')],
+        unique=False,
+        postgresql_where=sa.text('active'),
+    )
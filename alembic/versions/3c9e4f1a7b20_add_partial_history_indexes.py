@@ -0,0 +1,42 @@
+"""add_partial_history_indexes
+
+Revision ID: 3c9e4f1a7b20
+Revises: 21a1b639b7a3
+Create Date: 2026-10-17 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9e4f1a7b20'
+down_revision: Union[str, Sequence[str], None] = '21a1b639b7a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_conversations_history',
+        'conversations',
+        ['agent_id', 'caller_phone', sa.text('created_at DESC')],
+        unique=False,
+        postgresql_where=sa.text("summary IS NOT NULL AND summary <> ''"),
+    )
+    op.create_index(
+        'ix_orders_history',
+        'orders',
+        ['agent_id', 'customer_phone', sa.text('created_at DESC')],
+        unique=False,
+        postgresql_where=sa.text('active = true'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_orders_history', table_name='orders')
+    op.drop_index('ix_conversations_history', table_name='conversations')
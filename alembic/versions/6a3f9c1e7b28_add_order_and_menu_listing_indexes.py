@@ -0,0 +1,44 @@
+"""add_order_and_menu_listing_indexes
+
+Revision ID: 6a3f9c1e7b28
+Revises: 0b6e4d2a9f75
+Create Date: 2026-10-17 17:25:51.318702
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a3f9c1e7b28'
+down_revision: Union[str, Sequence[str], None] = '0b6e4d2a9f75'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_orders_agent_created',
+        'orders',
+        ['agent_id', sa.text('created_at DESC')],
+        unique=False,
+        postgresql_where=sa.text('active'),
+    )
+    op.create_index(op.f('ix_order_items_order_id'), 'order_items', ['order_id'], unique=False)
+    op.create_index(
+        'ix_menu_items_agent_category_name',
+        'menu_items',
+        ['agent_id', 'category', 'name'],
+        unique=False,
+        postgresql_where=sa.text('active'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_menu_items_agent_category_name', table_name='menu_items')
+    op.drop_index(op.f('ix_order_items_order_id'), table_name='order_items')
+    op.drop_index('ix_orders_agent_created', table_name='orders')
@@ -0,0 +1,50 @@
+"""add_conversation_listing_indexes
+
+Revision ID: 7d2a9c5e8f14
+Revises: 3c9e4f1a7b20
+Create Date: 2026-10-17 10:03:27.540918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2a9c5e8f14'
+down_revision: Union[str, Sequence[str], None] = '3c9e4f1a7b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_conversations_agent_created',
+        'conversations',
+        ['agent_id', sa.text('created_at DESC')],
+        unique=False,
+        postgresql_where=sa.text('active'),
+    )
+    op.create_index(
+        'ix_conversations_caller_created',
+        'conversations',
+        ['caller_phone', 'agent_id', sa.text('created_at DESC')],
+        unique=False,
+        postgresql_where=sa.text('active'),
+    )
+    op.create_index(
+        'ix_messages_conversation_sequence',
+        'messages',
+        ['conversation_id', 'sequence_number'],
+        unique=False,
+        postgresql_where=sa.text('active'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_messages_conversation_sequence', table_name='messages')
+    op.drop_index('ix_conversations_caller_created', table_name='conversations')
+    op.drop_index('ix_conversations_agent_created', table_name='conversations')
@@ -0,0 +1,36 @@
+"""add_menu_item_search_trigram_index
+
+Revision ID: 8c4e2f7a1d93
+Revises: 6a3f9c1e7b28
+Create Date: 2026-10-17 18:02:37.514920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4e2f7a1d93'
+down_revision: Union[str, Sequence[str], None] = '6a3f9c1e7b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_menu_items_search_trgm',
+        'menu_items',
+        [sa.text("(coalesce(name, '') || ' ' || coalesce(description, '') || ' ' || coalesce(ingredients, '')) gin_trgm_ops")],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_where=sa.text('active'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_menu_items_search_trgm', table_name='menu_items')
@@ -0,0 +1,35 @@
+"""add_message_count_to_conversations
+
+Revision ID: a4f81e3b6c57
+Revises: 7d2a9c5e8f14
+Create Date: 2026-10-17 10:41:09.772615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4f81e3b6c57'
+down_revision: Union[str, Sequence[str], None] = '7d2a9c5e8f14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('conversations', sa.Column('message_count', sa.Integer(), nullable=True, default=0))
+    # Seed the counter from the highest sequence number already stored
+    op.execute(
+        "UPDATE conversations SET message_count = COALESCE("
+        "(SELECT MAX(sequence_number) FROM messages WHERE messages.conversation_id = conversations.id), 0)"
+    )
+    # Make the column NOT NULL after updating existing records
+    op.alter_column('conversations', 'message_count', nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('conversations', 'message_count')
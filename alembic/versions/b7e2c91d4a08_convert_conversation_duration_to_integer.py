@@ -0,0 +1,42 @@
+"""convert_conversation_duration_to_integer
+
+Revision ID: b7e2c91d4a08
+Revises: a4f81e3b6c57
+Create Date: 2026-10-17 11:26:52.084133
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2c91d4a08'
+down_revision: Union[str, Sequence[str], None] = 'a4f81e3b6c57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column(
+        'conversations',
+        'duration_seconds',
+        existing_type=sa.String(),
+        type_=sa.Integer(),
+        existing_nullable=True,
+        postgresql_using="NULLIF(duration_seconds, '')::integer",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column(
+        'conversations',
+        'duration_seconds',
+        existing_type=sa.Integer(),
+        type_=sa.String(),
+        existing_nullable=True,
+        postgresql_using="duration_seconds::varchar",
+    )
@@ -0,0 +1,57 @@
+"""maintain_order_total_with_trigger
+
+Revision ID: d3b7a5e9c210
+Revises: 8c4e2f7a1d93
+Create Date: 2026-10-17 18:31:12.084417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3b7a5e9c210'
+down_revision: Union[str, Sequence[str], None] = '8c4e2f7a1d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION recompute_order_total() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                UPDATE orders SET total_price = (
+                    SELECT COALESCE(SUM(quantity * price), 0) FROM order_items WHERE order_id = OLD.order_id
+                ) WHERE id = OLD.order_id;
+            END IF;
+            IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.order_id IS DISTINCT FROM OLD.order_id) THEN
+                UPDATE orders SET total_price = (
+                    SELECT COALESCE(SUM(quantity * price), 0) FROM order_items WHERE order_id = NEW.order_id
+                ) WHERE id = NEW.order_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER trg_order_items_total "
+        "AFTER INSERT OR DELETE OR UPDATE OF quantity, price, order_id ON order_items "
+        "FOR EACH ROW EXECUTE FUNCTION recompute_order_total()"
+    )
+    # Bring existing totals in line with their items
+    op.execute(
+        "UPDATE orders SET total_price = COALESCE("
+        "(SELECT SUM(quantity * price) FROM order_items WHERE order_items.order_id = orders.id), 0)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_order_items_total ON order_items")
+    op.execute("DROP FUNCTION IF EXISTS recompute_order_total()")
@@ -0,0 +1,70 @@
+"""convert_conversation_columns_to_enums
+
+Revision ID: e3a9d5f27c61
+Revises: b7e2c91d4a08
+Create Date: 2026-10-17 14:02:37.519406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a9d5f27c61'
+down_revision: Union[str, Sequence[str], None] = 'b7e2c91d4a08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+conversation_type = postgresql.ENUM('voice', 'sms', 'message', name='conversation_type')
+conversation_status = postgresql.ENUM(
+    'active', 'completed', 'failed', 'cancelled', name='conversation_status'
+)
+message_role = postgresql.ENUM('user', 'assistant', 'system', name='message_role')
+
+# (table, column, enum type, nullable, replacement for out-of-domain values)
+_ENUM_COLUMNS = (
+    ('conversations', 'conversation_type', conversation_type, False, 'voice'),
+    ('conversations', 'status', conversation_status, True, 'completed'),
+    # Older transcripts stored "unknown" when Deepgram sent no role
+    ('messages', 'role', message_role, False, 'system'),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    for table, column, enum_type, nullable, replacement in _ENUM_COLUMNS:
+        # The cast fails on any value the enum does not define
+        allowed = ", ".join(f"'{value}'" for value in enum_type.enums)
+        op.execute(
+            f"UPDATE {table} SET {column} = '{replacement}' "
+            f"WHERE {column} IS NOT NULL AND {column} NOT IN ({allowed})"
+        )
+        enum_type.create(bind, checkfirst=True)
+        op.alter_column(
+            table,
+            column,
+            existing_type=sa.String(),
+            type_=enum_type,
+            existing_nullable=nullable,
+            postgresql_using=f"{column}::{enum_type.name}",
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    for table, column, enum_type, nullable, _ in reversed(_ENUM_COLUMNS):
+        op.alter_column(
+            table,
+            column,
+            existing_type=enum_type,
+            type_=sa.String(),
+            existing_nullable=nullable,
+            postgresql_using=f"{column}::varchar",
+        )
+        enum_type.drop(bind, checkfirst=True)
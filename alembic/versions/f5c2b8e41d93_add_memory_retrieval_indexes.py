@@ -0,0 +1,42 @@
+"""add_memory_retrieval_indexes
+
+Revision ID: f5c2b8e41d93
+Revises: e3a9d5f27c61
+Create Date: 2026-10-17 15:18:44.207361
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5c2b8e41d93'
+down_revision: Union[str, Sequence[str], None] = 'e3a9d5f27c61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_memories_agent_type_importance',
+        'memories',
+        ['agent_id', 'memory_type', sa.text('importance DESC'), sa.text('created_at DESC')],
+        unique=False,
+        postgresql_where=sa.text('active'),
+    )
+    op.create_index(
+        'ix_memories_agent_importance',
+        'memories',
+        ['agent_id', sa.text('importance DESC'), sa.text('last_used_at DESC')],
+        unique=False,
+        postgresql_where=sa.text('active'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_memories_agent_importance', table_name='memories')
+    op.drop_index('ix_memories_agent_type_importance', table_name='memories')
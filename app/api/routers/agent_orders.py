@@ -1,7 +1,7 @@
 from datetime import datetime, date, timezone
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from app.api.schemas.order import OrderSchema, OrderCreateSchema
@@ -10,6 +10,22 @@ from app.services.order_service import OrderService
 
 router = APIRouter()
 
+# Orders listing pages on request; the cursor for the next page is sent in this header
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 100
+
+
+def _encode_cursor(order) -> str:
+    return f"{order.created_at.isoformat()}|{order.id}"
+
+
+def _decode_cursor(cursor: str):
+    try:
+        created_at, order_id = cursor.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), order_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 
 @router.post(
     "/{agent_id}/orders",
@@ -42,6 +58,7 @@ def create_agent_order(
 )
 def get_agent_orders(
     agent_id: str,
+    response: Response,
     start_date: Optional[date] = Query(
         None,
         description="Start date for filtering orders (YYYY-MM-DD). Defaults to today.",
@@ -50,19 +67,41 @@ def get_agent_orders(
         None,
         description="End date for filtering orders (YYYY-MM-DD). Defaults to today.",
     ),
+    limit: Optional[int] = Query(
+        None,
+        ge=1,
+        le=500,
+        description=(
+            "Maximum number of orders to return. Omit both limit and cursor to get every "
+            f"order in the date range; with a cursor, defaults to {DEFAULT_PAGE_SIZE}."
+        ),
+    ),
+    cursor: Optional[str] = Query(
+        None,
+        description=f"Resume after this cursor, taken from the {NEXT_CURSOR_HEADER} response header",
+    ),
     db: Session = Depends(get_db),
 ):
     """
-    Retrieves all orders associated with a specific agent, with optional date filtering.
-    By default, it returns orders for the current day.
+    Retrieves orders associated with a specific agent, newest first, with optional date filtering.
+    By default, it returns every order for the current day. Pagination is opt-in: pass limit
+    (and then cursor) to page; when more orders remain, the cursor for the next page is
+    returned in the X-Next-Cursor header.
     """
+    before = _decode_cursor(cursor) if cursor else None
+    if before and limit is None:
+        limit = DEFAULT_PAGE_SIZE
     try:
         if start_date is None:
             start_date = datetime.now(timezone.utc).date()
         if end_date is None:
             end_date = datetime.now(timezone.utc).date()
 
-        orders = OrderService.get_agent_orders(db, agent_id, start_date, end_date)
+        orders = OrderService.get_agent_orders(
+            db, agent_id, start_date, end_date, limit=limit, before=before
+        )
+        if limit and len(orders) == limit:
+            response.headers[NEXT_CURSOR_HEADER] = _encode_cursor(orders[-1])
         return orders
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
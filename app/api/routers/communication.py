@@ -1,13 +1,11 @@
 import asyncio
-import json
 import time
-import uuid
 from datetime import datetime, timezone
 from typing import Optional, List
 
+import orjson
 from fastapi import APIRouter, Request, WebSocket, Form, HTTPException, Depends
 from fastapi.responses import Response
-from sqlalchemy import func
 from sqlalchemy.orm import Session
 from twilio.twiml.voice_response import VoiceResponse, Connect
 
@@ -15,7 +13,7 @@ from app.config.settings import settings
 from app.models import Agent, Conversation, ToolCall, Message, get_db
 from app.services.audio_service import AudioService
 from app.services.conversation_service import ConversationService
-from app.services.order_service import OrderService
+from app.services.message_writer import message_writer
 from app.tools.registry import global_registry
 from app.utils.logging_config import app_logger as logger
 from app.utils.twilio_utils import (
@@ -58,21 +56,6 @@ async def handle_agent_voice_call(
             db=db,
         )
 
-        try:
-            order_service = OrderService()
-            order_service.db = db  # Set the database session
-            order_service.create_preemptive_order(conversation)
-            logger.info(
-                "[ORDER] Preemptive order created for conversation %s", conversation.id
-            )
-        except Exception as order_error:
-            logger.error(
-                "[ORDER] Failed to create preemptive order for conversation %s: %s",
-                conversation.id,
-                str(order_error),
-            )
-            # Don't fail the call if order creation fails
-
         logger.info("[VOICE] Conversation created: %s", conversation.id)
 
     except HTTPException as e:
@@ -334,8 +317,8 @@ async def handle_function_call_request(
         arguments_str = function_info.get("arguments", "{}")
 
         try:
-            parameters = json.loads(arguments_str)
-        except json.JSONDecodeError:
+            parameters = orjson.loads(arguments_str)
+        except orjson.JSONDecodeError:
             logger.error("Failed to parse function arguments: %s", arguments_str)
             parameters = {}
 
@@ -347,13 +330,15 @@ async def handle_function_call_request(
             "type": "FunctionCallResponse",
             "id": function_call_id,
             "name": function_name,
-            "content": json.dumps(result) if isinstance(result, dict) else str(result),
+            "content": (
+                orjson.dumps(result).decode() if isinstance(result, dict) else str(result)
+            ),
         }
-        await deepgram_ws.send(json.dumps(response_message))
+        await deepgram_ws.send(orjson.dumps(response_message).decode())
 
         if isinstance(result, dict) and result.get("_trigger_close"):
             logger.info("Hangup signal detected - sending Close message to Deepgram")
-            await deepgram_ws.send(json.dumps({"type": "Close"}))
+            await deepgram_ws.send(orjson.dumps({"type": "Close"}).decode())
 
     except Exception as e:
         logger.exception("Error handling function call request: %s", e)
@@ -362,14 +347,20 @@ async def handle_function_call_request(
                 "type": "FunctionCallResponse",
                 "id": function_call_id,
                 "name": function_name or "unknown",
-                "content": json.dumps({"success": False, "error": str(e)}),
+                "content": orjson.dumps({"success": False, "error": str(e)}).decode(),
             }
             try:
-                await deepgram_ws.send(json.dumps(error_response))
+                await deepgram_ws.send(orjson.dumps(error_response).decode())
             except Exception as send_error:
                 logger.error("Failed to send error response: %s", send_error)
 
 
+def _log_message_write_failure(written: "asyncio.Future[int]"):
+    """Done-callback for queued message writes; retrieves and logs a failed write"""
+    if not written.cancelled() and written.exception() is not None:
+        logger.error("Failed to store ConversationText: %s", written.exception())
+
+
 async def handle_conversation_text(
     message_json: dict,
     conversation: Conversation,
@@ -380,11 +371,13 @@ async def handle_conversation_text(
     """Handle ConversationText messages from Deepgram and persist them."""
 
     async def persist_audio_for_message(
-        conv_id: str, msg_id: str, role: str, chunks: list[bytes]
+        conv_id: str, msg_id: str, role: str, chunks: list[bytes], written: asyncio.Future
     ):
         try:
             if not chunks:
                 return
+            # The message row must be committed before it can be updated
+            await written
             # Use AudioService static method to save audio chunks
             path = AudioService.save_audio_chunks(
                 audio_chunks=chunks,
@@ -405,47 +398,35 @@ async def handle_conversation_text(
             logger.exception("Error in persist_audio_for_message: %s", e)
 
     try:
-        role = message_json.get("role", "unknown")
+        role = message_json.get("role")
         content = message_json.get("content", "")
         if not content.strip():
             return
+        if role not in ("user", "assistant"):
+            # messages.role is an enum; the writer would reject the row and lose the message
+            logger.warning("Skipping ConversationText with unexpected role %r", role)
+            return
 
         logger.info("Storing ConversationText: %s -> %s...", role, content[:100])
 
-        # Get the next sequence number for this conversation
-        max_sequence = (
-            db_session.query(func.max(Message.sequence_number))
-            .filter(Message.conversation_id == conversation.id)
-            .scalar()
-        ) or 0
-
-        # Create new message directly
-        message = Message(
-            id=str(uuid.uuid4()),
-            conversation_id=conversation.id,
-            role=role,
-            content=content,
-            sequence_number=max_sequence + 1,
-            message_type="conversation",
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc),
+        # Queue the message; it is committed with others in the next batch
+        message_id, written = await message_writer.enqueue(
+            conversation.id, role, content, message_type="conversation"
         )
-
-        db_session.add(message)
-        db_session.commit()
-        db_session.refresh(message)
+        # Only messages with audio await the write; report failures for the rest too
+        written.add_done_callback(_log_message_write_failure)
 
         if role == "user" and user_audio_buffer:
             chunks = list(user_audio_buffer)
             user_audio_buffer.clear()
             asyncio.create_task(
-                persist_audio_for_message(conversation.id, message.id, role, chunks)
+                persist_audio_for_message(conversation.id, message_id, role, chunks, written)
             )
         elif role == "assistant" and agent_audio_buffer:
             chunks = list(agent_audio_buffer)
             agent_audio_buffer.clear()
             asyncio.create_task(
-                persist_audio_for_message(conversation.id, message.id, role, chunks)
+                persist_audio_for_message(conversation.id, message_id, role, chunks, written)
             )
 
     except Exception as e:
@@ -13,8 +13,9 @@ from app.api.schemas.memory_schemas import (
     MemoryUpdateRequest,
     MemorySearchRequest
 )
-from app.models import get_db, Memory, Agent
+from app.models import get_db, Memory
 from app.services.memory_service import MemoryService
+from app.utils.context_utils import agent_exists
 
 router = APIRouter()
 
@@ -55,8 +56,7 @@ async def get_agent_memories(
 ):
     """Get memories for a specific agent with optional filters"""
     # Verify agent exists and user has access
-    agent = db.query(Agent).filter(Agent.id == agent_id, Agent.active == True).first()
-    if not agent:
+    if not agent_exists(db, agent_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Agent not found"
         )
@@ -72,7 +72,7 @@ async def get_agent_memories(
         order_by=order_by
     )
 
-    memories = MemoryService.search_memories(db, search_req)
+    memories = MemoryService.search_memories(db, search_req, with_embedding=True, as_rows=True)
     return [_serialize_memory(memory) for memory in memories]
 
 
@@ -103,8 +103,7 @@ async def create_memory(
 ):
     """Create a new memory for an agent"""
     # Verify agent exists
-    agent = db.query(Agent).filter(Agent.id == agent_id, Agent.active == True).first()
-    if not agent:
+    if not agent_exists(db, agent_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Agent not found"
         )
@@ -189,13 +188,14 @@ async def get_memories_by_type(
 ):
     """Get all memories of a specific type for an agent"""
     # Verify agent exists
-    agent = db.query(Agent).filter(Agent.id == agent_id, Agent.active == True).first()
-    if not agent:
+    if not agent_exists(db, agent_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Agent not found"
         )
 
-    memories = MemoryService.get_memories_by_type(db, agent_id, memory_type, limit=limit)
+    memories = MemoryService.get_memories_by_type(
+        db, agent_id, memory_type, limit=limit, with_embedding=True, as_rows=True
+    )
     return [_serialize_memory(memory) for memory in memories]
 
 
@@ -209,14 +209,18 @@ async def get_important_memories(
 ):
     """Get the most important memories for an agent"""
     # Verify agent exists
-    agent = db.query(Agent).filter(Agent.id == agent_id, Agent.active == True).first()
-    if not agent:
+    if not agent_exists(db, agent_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Agent not found"
         )
 
     memories = MemoryService.get_important_memories(
-        db, agent_id, importance_threshold=importance_threshold, limit=limit
+        db,
+        agent_id,
+        importance_threshold=importance_threshold,
+        limit=limit,
+        with_embedding=True,
+        as_rows=True,
     )
     return [_serialize_memory(memory) for memory in memories]
 
@@ -240,7 +244,9 @@ async def get_conversation_memories(
             status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found"
         )
 
-    memories = MemoryService.get_memories_by_conversation(db, conversation_id)
+    memories = MemoryService.get_memories_by_conversation(
+        db, conversation_id, with_embedding=True, as_rows=True
+    )
     return [_serialize_memory(memory) for memory in memories]
 
 
@@ -283,8 +289,7 @@ async def bulk_create_memories(
 ):
     """Create multiple memories in a single transaction"""
     # Verify agent exists
-    agent = db.query(Agent).filter(Agent.id == agent_id, Agent.active == True).first()
-    if not agent:
+    if not agent_exists(db, agent_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Agent not found"
         )
@@ -313,8 +318,7 @@ async def get_memory_stats(
 ):
     """Get statistics about an agent's memories"""
     # Verify agent exists
-    agent = db.query(Agent).filter(Agent.id == agent_id, Agent.active == True).first()
-    if not agent:
+    if not agent_exists(db, agent_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Agent not found"
         )
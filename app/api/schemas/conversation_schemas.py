@@ -13,7 +13,7 @@ class ConversationResponse(BaseModel):
     status: str
     started_at: Optional[datetime]
     ended_at: Optional[datetime]
-    duration_seconds: Optional[str]
+    duration_seconds: Optional[int]
     summary: Optional[str]
     created_at: datetime
     updated_at: datetime
@@ -5,26 +5,42 @@ This service consolidates all agent configuration and context building logic,
 including business details, menu items, conversation history, and order history.
 """
 
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Any, Optional, Callable
 
 from sqlalchemy.orm import Session
 
 from app.config.agent_constants import get_platform_template
-from app.models import Agent
+from app.models import Agent, Conversation
+from app.models.database import get_db_session
 from app.tools.registry import global_registry
 from app.utils.appointment_builder import build_appointment_context
 from app.utils.context_formatters import format_business_context
-from app.utils.context_utils import get_phone_from_conversation, get_current_order_id
+from app.utils.context_utils import get_conversation_with_order, get_current_order
 from app.utils.history_builders import (
-    build_historical_conversations,
-    build_historical_orders,
+    build_caller_history,
     build_current_conversation_context,
 )
 from app.utils.logging_config import app_logger
 from app.utils.menu_builder import build_menu_context
 from app.utils.timezone_utils import build_time_context_for_agent
+from app.utils.ttl_cache import TTLCache
 from app.utils.memory_builder import build_memory_context, build_rules_and_lessons_context
 
+# Context queries are independent and I/O bound, so they run concurrently.
+# Each task gets its own session because a Session is not thread-safe.
+_CONTEXT_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="context-builder")
+
+
+def _run_with_session(builder: Callable, *args, **kwargs):
+    """Run a context builder with a dedicated database session"""
+    db_session = get_db_session()
+    try:
+        return builder(db_session, *args, **kwargs)
+    finally:
+        db_session.close()
+
 
 class ContextBuilderService:
     """Service for building comprehensive agent context from all relevant data sources"""
@@ -52,20 +68,26 @@ class ContextBuilderService:
             Complete agent configuration with all context
         """
         try:
+            # Load the conversation, its order and order items in a single query
+            conversation = (
+                get_conversation_with_order(self.db_session, conversation_id)
+                if conversation_id else None
+            )
+
             # Extract phone number from conversation if not provided
-            if conversation_id and not phone_number:
-                phone_number = get_phone_from_conversation(self.db_session, conversation_id)
+            if conversation and not phone_number:
+                phone_number = conversation.caller_phone
 
             # Build all context components
             context_data = self._gather_context_data(
-                agent, phone_number, conversation_id, lookback_days
+                agent, phone_number, conversation_id, lookback_days, conversation
             )
 
             # Build unified system prompt
             system_prompt = self._build_unified_system_prompt(agent, context_data)
 
-            # Return complete Deepgram Agent API configuration
-            return {
+            # Complete Deepgram Agent API configuration
+            config = {
                 "type": "Settings",
                 "audio": {
                     "input": {"encoding": "mulaw", "sample_rate": 8000},
@@ -93,16 +115,23 @@ class ContextBuilderService:
                 },
             }
 
-        except Exception as e:
-            app_logger.error(f"Failed to build complete agent config: {str(e)}")
+            return config
+
+        except Exception:
+            app_logger.exception(f"Failed to build complete agent config for agent {agent.id}")
             return self._build_fallback_config(agent)
 
     def _gather_context_data(
-            self, agent: Agent, phone_number: Optional[str], conversation_id: Optional[str], lookback_days: int
+            self,
+            agent: Agent,
+            phone_number: Optional[str],
+            conversation_id: Optional[str],
+            lookback_days: int,
+            conversation: Optional[Conversation] = None,
     ) -> Dict[str, str]:
         """Gather all context data components based on agent capabilities"""
         context_data = {
-            "business": format_business_context(agent),
+            "business": _get_business_context(agent),
             "menu": "",
             "current_conversation": "",
             "historical_conversations": "",
@@ -113,8 +142,8 @@ class ContextBuilderService:
         }
 
         # Determine agent capabilities (mutually exclusive)
-        ordering_enabled = getattr(agent, 'ordering_enabled', False)
-        booking_enabled = getattr(agent, 'booking_enabled', False)
+        ordering_enabled = agent.ordering_enabled
+        booking_enabled = agent.booking_enabled
 
         # Ensure mutual exclusivity - if both are true, default to booking
         if ordering_enabled and booking_enabled:
@@ -122,98 +151,100 @@ class ContextBuilderService:
             ordering_enabled = False
             booking_enabled = True
 
-        # Agent memories - get both general memories and critical rules/lessons
-        context_data["memories"] = build_memory_context(
-            self.db_session, agent, conversation_id, limit=5
-        )
-
-        # Critical rules and lessons (separate section for high priority)
-        context_data["rules_and_lessons"] = build_rules_and_lessons_context(
-            self.db_session, agent
-        )
+        # Submit every independent query up front, then collect the results
+        futures = {
+            "memories": _CONTEXT_EXECUTOR.submit(
+                _run_with_session, build_memory_context, agent, conversation_id, limit=5
+            ),
+            # Critical rules and lessons (separate section for high priority)
+            "rules_and_lessons": _CONTEXT_EXECUTOR.submit(
+                _run_with_session, build_rules_and_lessons_context, agent
+            ),
+        }
 
         # Menu context (ONLY if ordering enabled)
         if ordering_enabled:
-            context_data["menu"] = build_menu_context(self.db_session, agent)
-
-        # Current conversation context (always include)
-        if conversation_id:
-            current_context, extracted_phone = build_current_conversation_context(
-                self.db_session, conversation_id
-            )
-            context_data["current_conversation"] = current_context
-            # Use extracted phone if not provided
-            if not phone_number:
-                phone_number = extracted_phone
+            futures["menu"] = _CONTEXT_EXECUTOR.submit(_run_with_session, build_menu_context, agent)
 
         # Historical contexts (only if we have a phone number)
         if phone_number:
-            context_data["historical_conversations"] = build_historical_conversations(
-                self.db_session, agent.id, phone_number, lookback_days,
-                exclude_conversation_id=conversation_id, limit=3
+            # Conversations and orders (ONLY if ordering enabled) share one UNION ALL query
+            current_order = get_current_order(conversation) if ordering_enabled else None
+            futures["caller_history"] = _CONTEXT_EXECUTOR.submit(
+                _run_with_session, build_caller_history, agent.id, phone_number, lookback_days,
+                exclude_conversation_id=conversation_id,
+                exclude_order_id=current_order.id if current_order else None,
+                include_orders=ordering_enabled,
+                limit=3,
             )
 
-            # Historical orders (ONLY if ordering enabled)
-            if ordering_enabled:
-                current_order_id = get_current_order_id(self.db_session, conversation_id) if conversation_id else None
-                context_data["historical_orders"] = build_historical_orders(
-                    self.db_session, agent.id, phone_number, lookback_days,
-                    exclude_order_id=current_order_id, limit=3
-                )
-
         # Appointment context (ONLY if booking enabled)
         if booking_enabled:
-            context_data["appointments"] = build_appointment_context(
-                agent, self.db_session, phone_number
+            futures["appointments"] = _CONTEXT_EXECUTOR.submit(
+                _run_with_session, lambda db_session: build_appointment_context(agent, db_session, phone_number)
             )
 
+        # Current conversation context (always include) - already loaded, no query needed
+        if conversation_id:
+            context_data["current_conversation"] = build_current_conversation_context(conversation)
+
+        for key, future in futures.items():
+            if key == "caller_history":
+                context_data.update(future.result())
+            else:
+                context_data[key] = future.result()
+
         return context_data
 
     def _build_unified_system_prompt(self, agent: Agent, context_data: Dict[str, str]) -> str:
         """Build the complete unified system prompt"""
-        # Platform template for consistent tone and behavior (dynamic based on agent capabilities)
-        prompt_parts = [get_platform_template(agent)]
-
-        # Agent's custom prompt (if available and not default)
-        if agent.system_prompt and agent.system_prompt.strip() != "You are a helpful AI assistant.":
-            prompt_parts.append(f"AGENT PERSONALITY:\n{agent.system_prompt}\n")
-
-        # Add critical rules and lessons EARLY in the prompt (high priority)
-        if context_data["rules_and_lessons"] and context_data["rules_and_lessons"].strip():
-            prompt_parts.append(f"{context_data['rules_and_lessons']}\n")
-
         # Build timezone-aware time context
-        agent_timezone = getattr(agent, "timezone", "UTC") or "UTC"
+        agent_timezone = agent.timezone or "UTC"
         time_context = build_time_context_for_agent(agent_timezone, agent.business_hours or {})
 
-        date_time_context = self._format_time_context(time_context)
-        prompt_parts.append(date_time_context)
-
-        # Add business details
-        prompt_parts.append(f"BUSINESS DETAILS:\n{context_data['business']}\n")
-
-        # Add general agent memories
-        if context_data["memories"] and context_data["memories"].strip():
-            prompt_parts.append(f"{context_data['memories']}\n")
-
-        # Add context components that have content - PRIORITIZE appointments over menu
-        context_sections = [
-            ("appointments", context_data["appointments"]),  # Moved appointments FIRST
-            ("menu", context_data["menu"]),
-            ("current_conversation", context_data["current_conversation"]),
-            ("historical_conversations", context_data["historical_conversations"]),
-            ("historical_orders", context_data["historical_orders"]),
-        ]
-
-        for section_name, content in context_sections:
-            if content and content.strip():
-                prompt_parts.append(f"{content}\n")
-
-        # Add service instructions
-        service_instructions = self._build_service_instructions(agent)
-        prompt_parts.append(service_instructions)
-
-        return "\n".join(prompt_parts)
+        # Agent's custom prompt (if available and not default)
+        agent_personality = ""
+        if agent.system_prompt and agent.system_prompt.strip() != "You are a helpful AI assistant.":
+            agent_personality = f"AGENT PERSONALITY:\n{agent.system_prompt}"
+
+        # Optional sections are omitted entirely when empty; appointments come before menu
+        return self._get_prompt_template(agent).format_map({
+            "agent_personality": _prompt_section(agent_personality),
+            "rules_and_lessons": _prompt_section(context_data["rules_and_lessons"]),
+            "date_time": self._format_time_context(time_context),
+            "business": context_data["business"],
+            "memories": _prompt_section(context_data["memories"]),
+            "appointments": _prompt_section(context_data["appointments"]),
+            "menu": _prompt_section(context_data["menu"]),
+            "current_conversation": _prompt_section(context_data["current_conversation"]),
+            "historical_conversations": _prompt_section(context_data["historical_conversations"]),
+            "historical_orders": _prompt_section(context_data["historical_orders"]),
+        })
+
+    def _get_prompt_template(self, agent: Agent) -> str:
+        """Get the prompt skeleton for the agent's capability set, building it once"""
+        key = (bool(agent.ordering_enabled), bool(agent.booking_enabled))
+        template = _PROMPT_TEMPLATES.get(key)
+        if template is None:
+            # Platform template and service instructions depend only on capabilities
+            platform_template = _escape_braces(get_platform_template(agent))
+            service_instructions = _escape_braces(self._build_service_instructions(agent))
+            template = (
+                f"{platform_template}\n"
+                "{agent_personality}"
+                "{rules_and_lessons}"
+                "{date_time}\n"
+                "BUSINESS DETAILS:\n{business}\n\n"
+                "{memories}"
+                "{appointments}"
+                "{menu}"
+                "{current_conversation}"
+                "{historical_conversations}"
+                "{historical_orders}"
+                f"{service_instructions}"
+            )
+            _PROMPT_TEMPLATES[key] = template
+        return template
 
     def _format_time_context(self, time_context: Dict) -> str:
         """Format time context into readable string with clear guidance about business hours"""
@@ -254,8 +285,8 @@ BUSINESS HOURS POLICY:
         ]
 
         # Determine agent capabilities (mutually exclusive)
-        ordering_enabled = getattr(agent, 'ordering_enabled', False)
-        booking_enabled = getattr(agent, 'booking_enabled', False)
+        ordering_enabled = agent.ordering_enabled
+        booking_enabled = agent.booking_enabled
 
         # Ensure mutual exclusivity - if both are true, default to booking
         if ordering_enabled and booking_enabled:
@@ -298,61 +329,92 @@ BUSINESS HOURS POLICY:
     def _extract_functions_from_registry(self, agent: Agent = None) -> list:
         """Extract function definitions from the tools registry based on agent capabilities"""
         try:
-            functions = []
-
             # Determine agent capabilities (mutually exclusive)
-            ordering_enabled = getattr(agent, 'ordering_enabled', False) if agent else False
-            booking_enabled = getattr(agent, 'booking_enabled', False) if agent else False
+            ordering_enabled = agent.ordering_enabled if agent else False
+            booking_enabled = agent.booking_enabled if agent else False
 
             # Ensure mutual exclusivity - if both are true, default to booking
             if ordering_enabled and booking_enabled:
                 ordering_enabled = False
                 booking_enabled = True
 
-            # Define tool categories
-            order_tools = {
-                'add_order_item', 'remove_order_item', 'update_order_item',
-                'get_order_summary', 'finalize_order', 'cancel_order',
-                'get_menu_item', 'find_customer_orders'
-            }
+            # The registry is static after startup; its size invalidates the cache if tools are added
+            return list(_registry_functions(
+                bool(ordering_enabled), bool(booking_enabled), len(global_registry.tool_descriptions)
+            ))
 
-            appointment_tools = {
-                'create_appointment', 'get_available_times', 'cancel_appointment',
-                'reschedule_appointment', 'get_upcoming_appointments', 'add_attendee_to_appointment'
-            }
+        except Exception:
+            app_logger.exception("Error extracting functions from registry")
+            return []
 
-            # Get all registered tools from the global registry
-            for tool_name, tool_description in global_registry.tool_descriptions.items():
-                tool_function_name = tool_description["name"]
-
-                # Filter tools based on agent capabilities
-                should_include_tool = True
-
-                if tool_function_name in order_tools and not ordering_enabled:
-                    should_include_tool = False
-                    app_logger.info(f"[REGISTRY] Excluding order tool: {tool_function_name} (ordering disabled)")
-
-                elif tool_function_name in appointment_tools and not booking_enabled:
-                    should_include_tool = False
-                    app_logger.info(f"[REGISTRY] Excluding appointment tool: {tool_function_name} (booking disabled)")
-
-                if should_include_tool:
-                    # Convert registry format to Deepgram Agent API format
-                    function_def = {
-                        "name": tool_description["name"],
-                        "description": tool_description["description"] or f"Execute {tool_name} function",
-                        "parameters": tool_description.get(
-                            "parameters",
-                            {"type": "object", "properties": {}, "required": []},
-                        ),
-                    }
-                    functions.append(function_def)
-                    app_logger.info(f"[REGISTRY] Included function: {function_def['name']}")
 
-            capability_type = "booking" if booking_enabled else ("ordering" if ordering_enabled else "general")
-            app_logger.info(f"Extracted {len(functions)} functions for {capability_type} agent: {[f['name'] for f in functions]}")
-            return functions
+# Business details render only from Agent columns; keyed on (agent_id, updated_at)
+_business_context_cache = TTLCache(maxsize=1024, ttl=3600)
 
-        except Exception as e:
-            app_logger.error(f"Error extracting functions from registry: {str(e)}")
-            return []
+
+def _get_business_context(agent: Agent) -> str:
+    """Business context for an agent, rebuilt only when the agent row changes"""
+    cache_key = (agent.id, agent.updated_at)
+    business_context = _business_context_cache.get(cache_key)
+    if business_context is None:
+        business_context = format_business_context(agent)
+        _business_context_cache.set(cache_key, business_context)
+    return business_context
+
+
+# Prompt skeletons keyed on (ordering_enabled, booking_enabled)
+_PROMPT_TEMPLATES: Dict[tuple, str] = {}
+
+
+def _prompt_section(content: Optional[str]) -> str:
+    """Render an optional prompt section, or nothing when it is blank"""
+    if content and content.strip():
+        return f"{content}\n\n"
+    return ""
+
+
+def _escape_braces(text: str) -> str:
+    """Escape literal braces so text can be embedded in a format template"""
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+# Tool categories used to filter the registry by agent capability
+_ORDER_TOOLS = frozenset({
+    'add_order_item', 'remove_order_item', 'update_order_item',
+    'get_order_summary', 'finalize_order', 'cancel_order',
+    'get_menu_item', 'find_customer_orders'
+})
+
+_APPOINTMENT_TOOLS = frozenset({
+    'create_appointment', 'get_available_times', 'cancel_appointment',
+    'reschedule_appointment', 'get_upcoming_appointments', 'add_attendee_to_appointment'
+})
+
+
+@lru_cache(maxsize=8)
+def _registry_functions(ordering_enabled: bool, booking_enabled: bool, registry_size: int) -> tuple:
+    """Convert registered tools to Deepgram Agent API function definitions for a capability set"""
+    functions = []
+
+    for tool_name, tool_description in global_registry.tool_descriptions.items():
+        tool_function_name = tool_description["name"]
+
+        # Filter tools based on agent capabilities
+        if tool_function_name in _ORDER_TOOLS and not ordering_enabled:
+            continue
+        if tool_function_name in _APPOINTMENT_TOOLS and not booking_enabled:
+            continue
+
+        # Convert registry format to Deepgram Agent API format
+        functions.append({
+            "name": tool_description["name"],
+            "description": tool_description["description"] or f"Execute {tool_name} function",
+            "parameters": tool_description.get(
+                "parameters",
+                {"type": "object", "properties": {}, "required": []},
+            ),
+        })
+
+    capability_type = "booking" if booking_enabled else ("ordering" if ordering_enabled else "general")
+    app_logger.info(f"Extracted {len(functions)} functions for {capability_type} agent: {[f['name'] for f in functions]}")
+    return tuple(functions)
@@ -57,6 +57,12 @@ class Settings(BaseSettings):
         DB_PORT: str = os.getenv("DB_PORT", "")
         DATABASE_URL: str = f"postgresql+psycopg2://{DB_USER}:{DB_PASS}@/{DB_NAME}?host={DB_HOST}&port={DB_PORT}"
 
+    # Connection pool; size it against the database's connection limit per instance
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "25"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "50"))
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "5"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
     # ChromaDB Cloud
     CHROMA_API_KEY: str = os.getenv("CHROMA_API_KEY", "")
     CHROMA_TENANT: str = os.getenv("CHROMA_TENANT", "")
@@ -11,6 +11,9 @@ from sqlalchemy import (
     Integer,
     Float,
     ARRAY,
+    Index,
+    Enum,
+    text,
 )
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
@@ -23,9 +26,23 @@ from app.config.settings import settings
 Base = declarative_base()
 
 DATABASE_URL = settings.DATABASE_URL
-engine = create_engine(DATABASE_URL)
+# Room in the compiled-statement cache for every query shape the app issues
+engine = create_engine(
+    DATABASE_URL,
+    query_cache_size=1200,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Low-cardinality columns stored as native PostgreSQL enums
+ConversationType = Enum("voice", "sms", "message", name="conversation_type")
+ConversationStatus = Enum("active", "completed", "failed", "cancelled", name="conversation_status")
+MessageRole = Enum("user", "assistant", "system", name="message_role")
+
 
 class User(Base):
     __tablename__ = "users"
@@ -136,11 +153,12 @@ class Agent(Base):
     users = relationship(
         "User", secondary="agent_users", back_populates="agents", viewonly=True
     )
-    conversations = relationship("Conversation", back_populates="agent")
-    orders = relationship("Order", back_populates="agent")
-    menu_items = relationship("MenuItem", back_populates="agent")
-    events = relationship("Event", back_populates="agent")
-    memories = relationship("Memory", back_populates="agent")
+    # Unbounded collections: load explicitly with a filtered query, never lazily
+    conversations = relationship("Conversation", back_populates="agent", lazy="raise")
+    orders = relationship("Order", back_populates="agent", lazy="raise")
+    menu_items = relationship("MenuItem", back_populates="agent", lazy="raise")
+    events = relationship("Event", back_populates="agent", lazy="raise")
+    memories = relationship("Memory", back_populates="agent", lazy="raise")
 
 
 class Conversation(Base):
@@ -149,24 +167,57 @@ class Conversation(Base):
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     agent_id = Column(String, ForeignKey("agents.id"), nullable=False)
     session_name = Column(String, nullable=False)  # e.g., "Call with +1234567890"
-    conversation_type = Column(String, nullable=False)  # voice, message
+    conversation_type = Column(ConversationType, nullable=False)  # voice, sms, message
     caller_phone = Column(String, nullable=False)
     twilio_sid = Column(String, nullable=True)  # CallSid or MessageSid
-    status = Column(String, default="active")  # active, completed, failed
+    status = Column(ConversationStatus, default="active")  # active, completed, failed, cancelled
     started_at = Column(DateTime, default=func.now())
     ended_at = Column(DateTime, nullable=True)
-    duration_seconds = Column(String, nullable=True)
+    duration_seconds = Column(Integer, nullable=True)
     summary = Column(Text, nullable=True)
+    message_count = Column(Integer, nullable=False, default=0)  # Last assigned message sequence number
     active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
     # Relationships
-    agent = relationship("Agent", back_populates="conversations")
+    agent = relationship("Agent", back_populates="conversations", lazy="selectin")
+    # Transcripts and their side records are loaded explicitly where needed
     messages = relationship(
-        "Message", back_populates="conversation", order_by="Message.sequence_number"
+        "Message",
+        back_populates="conversation",
+        order_by="Message.sequence_number",
+        lazy="raise",
+    )
+    tool_calls = relationship("ToolCall", back_populates="conversation", lazy="raise")
+    orders = relationship("Order", back_populates="conversation", lazy="raise")
+
+    __table_args__ = (
+        # Caller history lookup: summarized conversations, newest first
+        Index(
+            "ix_conversations_history",
+            "agent_id",
+            "caller_phone",
+            created_at.desc(),
+            postgresql_where=text("summary IS NOT NULL AND summary <> ''"),
+        ),
+        # Agent conversation listing; covers the statistics aggregates for index-only scans
+        Index(
+            "ix_conversations_agent_created",
+            "agent_id",
+            created_at.desc(),
+            postgresql_where=text("active"),
+            postgresql_include=["caller_phone", "conversation_type", "duration_seconds"],
+        ),
+        # Caller conversation listing, optionally narrowed to one agent
+        Index(
+            "ix_conversations_caller_created",
+            "caller_phone",
+            "agent_id",
+            created_at.desc(),
+            postgresql_where=text("active"),
+        ),
     )
-    tool_calls = relationship("ToolCall", back_populates="conversation")
 
 
 class Message(Base):
@@ -174,7 +225,7 @@ class Message(Base):
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     conversation_id = Column(String, ForeignKey("conversations.id"), nullable=False)
-    role = Column(String, nullable=False)  # "user" or "assistant"
+    role = Column(MessageRole, nullable=False)  # "user" or "assistant"
     content = Column(Text, nullable=False)  # Message content
     audio_file_path = Column(
         String, nullable=True
@@ -188,6 +239,16 @@ class Message(Base):
     # Relationships
     conversation = relationship("Conversation", back_populates="messages")
 
+    __table_args__ = (
+        # Transcript reads in chronological order
+        Index(
+            "ix_messages_conversation_sequence",
+            "conversation_id",
+            "sequence_number",
+            postgresql_where=text("active"),
+        ),
+    )
+
 
 class ToolCall(Base):
     __tablename__ = "tool_calls"
@@ -218,6 +279,7 @@ class Order(Base):
     status = Column(
         String, nullable=False, default="new"
     )  # e.g., new, in_progress, ready, completed
+    # Maintained by the trg_order_items_total trigger from order_items
     total_price = Column(Float, nullable=True)
     active = Column(Boolean, default=True)
     pickup_time = Column(String, nullable=True)  # scheduled pickup time
@@ -231,9 +293,31 @@ class Order(Base):
 
     # Relationships
     agent = relationship("Agent", back_populates="orders")
-    conversation = relationship("Conversation")
+    conversation = relationship("Conversation", back_populates="orders")
+    # Order responses always include their items
     order_items = relationship(
-        "OrderItem", back_populates="order", cascade="all, delete-orphan"
+        "OrderItem",
+        back_populates="order",
+        cascade="all, delete-orphan",
+        lazy="selectin",
+    )
+
+    __table_args__ = (
+        # Customer order history lookup: active orders, newest first
+        Index(
+            "ix_orders_history",
+            "agent_id",
+            "customer_phone",
+            created_at.desc(),
+            postgresql_where=text("active = true"),
+        ),
+        # Agent order listing, newest first
+        Index(
+            "ix_orders_agent_created",
+            "agent_id",
+            created_at.desc(),
+            postgresql_where=text("active"),
+        ),
     )
 
 
@@ -241,7 +325,7 @@ class OrderItem(Base):
     __tablename__ = "order_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(String, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(String, ForeignKey("orders.id"), nullable=False, index=True)
     name = Column(String, nullable=False)
     quantity = Column(Integer, nullable=False)
     price = Column(Float, nullable=False)
@@ -286,6 +370,34 @@ class MenuItem(Base):
     # Relationships
     agent = relationship("Agent", back_populates="menu_items")
 
+    __table_args__ = (
+        # Menu numbers are unique among an agent's active items
+        Index(
+            "ux_menu_items_agent_number",
+            "agent_id",
+            "number",
+            unique=True,
+            postgresql_where=text("active AND number IS NOT NULL AND number <> ''"),
+        ),
+        # Menu listings and rendered menus, ordered by category then name
+        Index(
+            "ix_menu_items_agent_category_name",
+            "agent_id",
+            "category",
+            "name",
+            postgresql_where=text("active"),
+        ),
+        # Trigram index backing the ILIKE search over name, description and ingredients
+        Index(
+            "ix_menu_items_search_trgm",
+            text(
+                "(coalesce(name, '') || ' ' || coalesce(description, '') || ' ' || coalesce(ingredients, '')) gin_trgm_ops"
+            ),
+            postgresql_using="gin",
+            postgresql_where=text("active"),
+        ),
+    )
+
 
 class Event(Base):
     __tablename__ = "events"
@@ -348,6 +460,26 @@ class Memory(Base):
     message = relationship("Message")
     coach = relationship("User")
 
+    __table_args__ = (
+        # Memory retrieval by type: most important first, then newest
+        Index(
+            "ix_memories_agent_type_importance",
+            "agent_id",
+            "memory_type",
+            importance.desc(),
+            created_at.desc(),
+            postgresql_where=text("active"),
+        ),
+        # Important memories across types, most recently used first
+        Index(
+            "ix_memories_agent_importance",
+            "agent_id",
+            importance.desc(),
+            last_used_at.desc(),
+            postgresql_where=text("active"),
+        ),
+    )
+
 
 def get_db_session():
     return SessionLocal()
@@ -2,6 +2,8 @@ import os
 import wave
 from typing import List, Optional
 
+from app.utils.logging_config import app_logger as logger
+
 
 class AudioService:
     """Service for handling audio recording and file management"""
@@ -31,7 +33,7 @@ class AudioService:
             filename = f"{message_id}.wav"
             file_path = os.path.join(audio_dir, filename)
 
-            print(f"Saving audio chunk to {file_path}")
+            logger.debug("Saving audio chunk to %s", file_path)
 
             # Combine all audio chunks
             if not audio_chunks:
@@ -46,11 +48,11 @@ class AudioService:
                 wav_file.setframerate(sample_rate)
                 wav_file.writeframes(combined_audio)
 
-            print(f"🎵 Saved audio file: {file_path} ({len(combined_audio)} bytes)")
+            logger.debug("Saved audio file: %s (%d bytes)", file_path, len(combined_audio))
             return file_path
 
         except Exception as e:
-            print(f"❌ Error saving audio file: {e}")
+            logger.error("Error saving audio file: %s", e)
             return None
 
     @staticmethod
@@ -70,10 +72,10 @@ class AudioService:
                     if os.path.isfile(file_path):
                         os.remove(file_path)
                 os.rmdir(audio_dir)
-                print(f"🗑️ Cleaned up audio directory: {audio_dir}")
+                logger.info("Cleaned up audio directory: %s", audio_dir)
                 return True
         except Exception as e:
-            print(f"❌ Error cleaning up audio: {e}")
+            logger.error("Error cleaning up audio: %s", e)
         return False
 
     @staticmethod
@@ -88,5 +90,5 @@ class AudioService:
                         files.append(os.path.join(audio_dir, file))
                 return sorted(files)
         except Exception as e:
-            print(f"❌ Error listing audio files: {e}")
+            logger.error("Error listing audio files: %s", e)
         return []
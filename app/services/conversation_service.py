@@ -1,23 +1,108 @@
+import asyncio
+import hashlib
+import re
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, Tuple
 
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy import Integer, Row, case, cast, func, update
+from sqlalchemy.orm import Session, contains_eager, load_only, raiseload
 
 from app.config.settings import settings
 from app.models import Conversation, Message, Agent
+from app.services.order_service import OrderService
 from app.utils.logging_config import app_logger as logger
+from app.utils.ttl_cache import TTLCache
 from app.utils.vertex_ai_client import get_vertex_ai_client
 
+# Generated summaries keyed on a digest of the transcript; retries and re-runs reuse them
+_summary_cache = TTLCache(maxsize=1024, ttl=7 * 24 * 3600)
+
+# System prompt for conversation summarization
+_SUMMARIZATION_PROMPT = """You are an assistant that summarizes business communication transcripts. Read the following transcript and create a clear, concise summary that includes:
+
+The main purpose of the conversation.
+
+Key questions or requests from the user.
+
+The agent's responses and explanations.
+
+Any decisions, commitments, or action items.
+
+Ignore filler text or casual conversation. Write the summary in professional, neutral language."""
+_SUMMARIZATION_PREFIX = f"{_SUMMARIZATION_PROMPT}\n\nConversation to summarize:\n\n"
+
+
+_COMMON_BUSINESS_TERMS = (
+    "appointment",
+    "booking",
+    "price",
+    "cost",
+    "hours",
+    "schedule",
+    "service",
+    "client",
+    "customer",
+    "inventory",
+    "product",
+    "meeting",
+)
+
+# Substring match (no word boundaries) so plurals like "appointments" still count
+_TOPIC_RE = re.compile("|".join(map(re.escape, _COMMON_BUSINESS_TERMS)), re.IGNORECASE)
+
+
+def next_message_sequence(db: Session, conversation_id: str) -> int:
+    """Atomically reserve the next message sequence number for a conversation.
+
+    The counter row stays locked until the caller commits, so concurrent
+    writers to the same conversation are serialized.
+    """
+    return db.execute(
+        update(Conversation)
+        .where(Conversation.id == conversation_id)
+        .values(message_count=Conversation.message_count + 1)
+        .returning(Conversation.message_count)
+    ).scalar_one()
+
+
+# The columns conversation listings render
+_LISTING_COLUMNS = (
+    Conversation.id,
+    Conversation.agent_id,
+    Conversation.session_name,
+    Conversation.conversation_type,
+    Conversation.caller_phone,
+    Conversation.twilio_sid,
+    Conversation.status,
+    Conversation.started_at,
+    Conversation.ended_at,
+    Conversation.duration_seconds,
+    Conversation.summary,
+    Conversation.created_at,
+    Conversation.updated_at,
+)
+
+
+def _conversation_listing_options() -> tuple:
+    """Loader options for conversation listings: only the columns listings render"""
+    return (
+        load_only(*_LISTING_COLUMNS),
+        # The agents join is there for the active filter; keep its row narrow
+        contains_eager(Conversation.agent).load_only(Agent.id, Agent.name, Agent.active),
+        raiseload("*"),
+    )
+
 
 class ConversationService:
     """Service for managing conversations, messages, and summaries"""
 
     def __init__(self, db: Session):
         self.db = db
-        # Initialize Vertex AI client
-        vertex_client = get_vertex_ai_client()
-        self.async_client = vertex_client.get_async_client()
+
+    @property
+    def async_client(self):
+        """Vertex AI async client, resolved on first use so plain CRUD never touches it"""
+        return get_vertex_ai_client().get_async_client()
 
     def create_conversation(
         self,
@@ -26,8 +111,9 @@ class ConversationService:
         conversation_type: str,
         session_name: str,
         twilio_sid: Optional[str] = None,
+        create_preemptive_order: bool = False,
     ) -> Conversation:
-        """Create a new conversation and automatically create a preemptive order"""
+        """Create a new conversation, optionally with its preemptive order, in one commit"""
         conversation = Conversation(
             agent_id=agent_id,
             caller_phone=caller_phone,
@@ -37,6 +123,21 @@ class ConversationService:
             status="active",
         )
         self.db.add(conversation)
+        self.db.flush()
+
+        if create_preemptive_order:
+            try:
+                # Savepoint so a failed order never takes the conversation down with it
+                with self.db.begin_nested():
+                    self.db.add(OrderService.build_preemptive_order(conversation))
+                logger.info("Created preemptive order for conversation %s", conversation.id)
+            except Exception as e:
+                logger.error(
+                    "Failed to create preemptive order for conversation %s: %s",
+                    conversation.id,
+                    str(e),
+                )
+
         self.db.commit()
         self.db.refresh(conversation)
         logger.info(
@@ -47,21 +148,9 @@ class ConversationService:
 
     async def end_conversation(self, conversation_id: str) -> bool:
         """End a conversation, calculate duration, and generate summary"""
-        conversation = (
-            self.db.query(Conversation)
-            .filter(Conversation.id == conversation_id)
-            .first()
-        )
-        if not conversation:
+        if not await asyncio.to_thread(self._mark_conversation_ended, conversation_id):
             return False
 
-        conversation.ended_at = datetime.now()
-        conversation.status = "completed"
-        if conversation.started_at:
-            duration = (conversation.ended_at - conversation.started_at).total_seconds()
-            conversation.duration_seconds = str(int(duration))
-        self.db.commit()
-
         # Generate conversation summary after ending the conversation
         try:
             logger.info("Generating summary for completed conversation %s", conversation_id)
@@ -72,6 +161,34 @@ class ConversationService:
 
         return True
 
+    def _mark_conversation_ended(self, conversation_id: str) -> bool:
+        """Set ended_at, status and duration; returns False if the conversation does not exist"""
+        # Timestamps and duration are computed by the database in a single UPDATE.
+        # statement_timestamp(), not now(): the session's transaction may have been
+        # open since call setup, and now() would return that start time.
+        ended_at = func.statement_timestamp()
+        updated = self.db.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(
+                ended_at=ended_at,
+                status="completed",
+                duration_seconds=case(
+                    (
+                        Conversation.started_at.isnot(None),
+                        cast(
+                            func.floor(func.extract("epoch", ended_at - Conversation.started_at)),
+                            Integer,
+                        ),
+                    ),
+                    else_=Conversation.duration_seconds,
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        self.db.commit()
+        return updated > 0
+
     def get_conversation(self, conversation_id: str) -> Optional[Conversation]:
         """Get conversation by ID"""
         return (
@@ -89,18 +206,12 @@ class ConversationService:
         message_type: str = "conversation",
     ) -> Message:
         """Add a new message to a conversation."""
-        max_seq = (
-            self.db.query(func.max(Message.sequence_number))
-            .filter(Message.conversation_id == conversation_id)
-            .scalar()
-            or 0
-        )
         message = Message(
             conversation_id=conversation_id,
             role=role,
             content=content,
             audio_file_path=audio_file_path,
-            sequence_number=max_seq + 1,
+            sequence_number=next_message_sequence(self.db, conversation_id),
             message_type=message_type,
         )
         self.db.add(message)
@@ -146,24 +257,29 @@ class ConversationService:
             )
             return None
 
-        messages = self.get_messages_for_summary(conversation_id)
+        messages = await asyncio.to_thread(self.get_messages_for_summary, conversation_id)
         if not messages:
             logger.info("No messages found for conversation %s", conversation_id)
             return None
 
-        conversation_text = self._format_messages_for_llm(messages)
+        conversation_text, participants, key_topics, cache_key = self._analyze_messages(messages)
         try:
-            full_prompt = f"{self._get_summarization_prompt()}\n\nConversation to summarize:\n\n{conversation_text}"
-            summary_response = await self.async_client.models.generate_content(
-                model=settings.GEMINI_LLM_MODEL, contents=full_prompt
-            )
-            summary = summary_response.text
+            summary = _summary_cache.get(cache_key)
+            if summary is None:
+                full_prompt = _SUMMARIZATION_PREFIX + conversation_text
+                summary_response = await self.async_client.models.generate_content(
+                    model=settings.GEMINI_LLM_MODEL, contents=full_prompt
+                )
+                summary = summary_response.text
+                _summary_cache.set(cache_key, summary)
+            else:
+                logger.info("Reusing cached summary for conversation %s", conversation_id)
             summary_data = {
                 "conversation_id": conversation_id,
                 "summary": summary,
                 "message_count": len(messages),
-                "participants": self._extract_participants(messages),
-                "key_topics": self._extract_key_topics(messages),
+                "participants": participants,
+                "key_topics": key_topics,
                 "duration_estimate": self._estimate_duration(messages),
                 "generated_at": messages[-1]["timestamp"] if messages else None,
             }
@@ -187,9 +303,26 @@ class ConversationService:
                 "message_count": len(messages),
             }
 
+    def iter_conversation_messages(self, conversation_id: str) -> Iterator[Row]:
+        """Stream a conversation's transcript as plain column rows, 200 at a time."""
+        return (
+            self.db.query(
+                Message.role,
+                Message.content,
+                Message.created_at,
+                Message.sequence_number,
+            )
+            .filter(
+                Message.conversation_id == conversation_id,
+                Message.active,
+                Message.message_type == "conversation",
+            )
+            .order_by(Message.sequence_number)
+            .yield_per(200)
+        )
+
     def get_messages_for_summary(self, conversation_id: str) -> List[dict]:
         """Get messages formatted for LLM summarization"""
-        messages = self.get_conversation_messages(conversation_id)
         return [
             {
                 "role": msg.role,
@@ -197,62 +330,38 @@ class ConversationService:
                 "timestamp": msg.created_at.isoformat(),
                 "sequence": msg.sequence_number,
             }
-            for msg in messages
-            if msg.message_type == "conversation"
+            for msg in self.iter_conversation_messages(conversation_id)
         ]
 
-    def _format_messages_for_llm(self, messages: List[Dict]) -> str:
-        """Format messages for LLM processing"""
-        return "\n".join(
-            [
-                f"[{msg['sequence']:03d}] {msg['role'].upper()}: {msg['content']}"
-                for msg in messages
-            ]
-        )
-
-    def _get_summarization_prompt(self) -> str:
-        """Get the system prompt for conversation summarization"""
-        return """You are an assistant that summarizes business communication transcripts. Read the following transcript and create a clear, concise summary that includes:
+    @staticmethod
+    def _analyze_messages(messages: List[Dict]) -> Tuple[str, List[str], List[str], str]:
+        """
+        Walk the transcript once to build everything summarization needs.
 
-The main purpose of the conversation.
+        Returns the LLM-formatted transcript, the participants, the key topics
+        and the summary cache key (a digest of ordered role:content pairs and
+        the model name).
+        """
+        lines = []
+        # Dicts as ordered sets: deduplicated in first-mention order
+        participants: Dict[str, None] = {}
+        topics: Dict[str, None] = {}
+        digest = hashlib.blake2b(f"{settings.GEMINI_LLM_MODEL}\n".encode(), digest_size=16)
 
-Key questions or requests from the user.
+        for index, msg in enumerate(messages):
+            role = msg["role"]
+            content = msg["content"]
 
-The agent's responses and explanations.
+            lines.append(f"[{msg['sequence']:03d}] {role.upper()}: {content}")
+            if role != "system":
+                participants[role] = None
+            topics.update(dict.fromkeys(match.group(0).lower() for match in _TOPIC_RE.finditer(content)))
 
-Any decisions, commitments, or action items.
+            if index:
+                digest.update(b"\n")
+            digest.update(f"{role}:{content}".encode())
 
-Ignore filler text or casual conversation. Write the summary in professional, neutral language."""
-
-    def _extract_participants(self, messages: List[Dict]) -> List[str]:
-        """Extract unique participants from messages"""
-        return list(
-            set(msg["role"] for msg in messages if msg["role"] not in ["system"])
-        )
-
-    def _extract_key_topics(self, messages: List[Dict]) -> List[str]:
-        """Extract key topics mentioned in the conversation"""
-        keywords = set()
-        common_business_terms = [
-            "appointment",
-            "booking",
-            "price",
-            "cost",
-            "hours",
-            "schedule",
-            "service",
-            "client",
-            "customer",
-            "inventory",
-            "product",
-            "meeting",
-        ]
-        for msg in messages:
-            content_lower = msg["content"].lower()
-            for term in common_business_terms:
-                if term in content_lower:
-                    keywords.add(term)
-        return list(keywords)
+        return "\n".join(lines), list(participants), list(topics), digest.hexdigest()
 
     def _estimate_duration(self, messages: List[Dict]) -> str:
         """Estimate conversation duration based on message count and content"""
@@ -276,8 +385,8 @@ Ignore filler text or casual conversation. Write the summary in professional, ne
             return False
         try:
             summary_text = summary_data.get("summary", "No summary available")
-            success = self.update_conversation_summary(
-                conversation_id=conversation_id, summary=summary_text
+            success = await asyncio.to_thread(
+                self.update_conversation_summary, conversation_id, summary_text
             )
             if success:
                 logger.info(
@@ -295,16 +404,15 @@ Ignore filler text or casual conversation. Write the summary in professional, ne
     def update_conversation_summary(self, conversation_id: str, summary: str) -> bool:
         """Update conversation with AI-generated summary"""
         try:
-            conversation = (
-                self.db.query(Conversation)
-                .filter(Conversation.id == conversation_id, Conversation.active)
-                .first()
-            )
+            updated = self.db.execute(
+                update(Conversation)
+                .where(Conversation.id == conversation_id, Conversation.active)
+                .values(summary=summary, updated_at=func.now())
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            self.db.commit()
 
-            if conversation:
-                conversation.summary = summary
-                conversation.updated_at = datetime.now()
-                self.db.commit()
+            if updated:
                 logger.info("Updated conversation %s with summary", conversation_id)
                 return True
             else:
@@ -324,7 +432,8 @@ Ignore filler text or casual conversation. Write the summary in professional, ne
         """Get conversations for an agent"""
         return (
             self.db.query(Conversation)
-            .join(Agent)
+            .join(Conversation.agent)
+            .options(*_conversation_listing_options())
             .filter(
                 Conversation.agent_id == agent_id,
                 Conversation.active,
@@ -342,7 +451,8 @@ Ignore filler text or casual conversation. Write the summary in professional, ne
         """Get conversation history for a specific caller"""
         query = (
             self.db.query(Conversation)
-            .join(Agent)
+            .join(Conversation.agent)
+            .options(*_conversation_listing_options())
             .filter(
                 Conversation.caller_phone == caller_phone,
                 Conversation.active,
@@ -365,6 +475,28 @@ Ignore filler text or casual conversation. Write the summary in professional, ne
         timeout_delta = timedelta(hours=timeout_hours)
         stale_threshold = datetime.now() - timeout_delta
 
+        stale_conversation_ids = await asyncio.to_thread(
+            self._find_stale_conversation_ids, stale_threshold
+        )
+
+        if not stale_conversation_ids:
+            logger.info("No stale conversations found.")
+            return
+
+        logger.info(f"Found {len(stale_conversation_ids)} stale conversations to clean up.")
+
+        for conversation_id in stale_conversation_ids:
+            logger.info(f"Ending stale conversation {conversation_id}...")
+            try:
+                await self.end_conversation(conversation_id)
+                logger.info(f"Successfully ended and summarized stale conversation {conversation_id}.")
+            except Exception as e:
+                logger.error(f"Error ending stale conversation {conversation_id}: {str(e)}")
+
+        logger.info("Stale conversation cleanup finished.")
+
+    def _find_stale_conversation_ids(self, stale_threshold: datetime) -> List[str]:
+        """Ids of active conversations with no message activity since the threshold"""
         # Query 1: Find stale conversations with messages
         last_message_subquery = (
             self.db.query(
@@ -401,22 +533,5 @@ Ignore filler text or casual conversation. Write the summary in professional, ne
         )
 
         stale_conversations = stale_with_messages + stale_without_messages
-
-        if not stale_conversations:
-            logger.info("No stale conversations found.")
-            return
-
-        unique_stale_conversations = {conv.id: conv for conv in stale_conversations}.values()
-
-        logger.info(f"Found {len(unique_stale_conversations)} stale conversations to clean up.")
-
-        for conv in unique_stale_conversations:
-            logger.info(f"Ending stale conversation {conv.id}...")
-            try:
-                await self.end_conversation(conv.id)
-                logger.info(f"Successfully ended and summarized stale conversation {conv.id}.")
-            except Exception as e:
-                logger.error(f"Error ending stale conversation {conv.id}: {str(e)}")
-
-        logger.info("Stale conversation cleanup finished.")
+        return list({conv.id: conv for conv in stale_conversations})
 
@@ -1,6 +1,6 @@
-import json
-from typing import Dict, Any
+from typing import Dict, Any, Union
 
+import orjson
 import websockets
 
 from app.config.settings import settings
@@ -9,6 +9,8 @@ from app.config.settings import settings
 class DeepgramService:
     def __init__(self, agent_config: Dict[str, Any]):
         self.agent_config = agent_config
+        # The config is fixed for the session, so serialize it once
+        self.config_payload = orjson.dumps(agent_config).decode()
         self.connection = None
 
     @staticmethod
@@ -33,10 +35,10 @@ class DeepgramService:
 
     async def send_config(self, websocket):
         """Send agent configuration to Deepgram"""
-        await websocket.send(json.dumps(self.agent_config))
+        await websocket.send(self.config_payload)
 
-    async def send_audio(self, websocket, audio_data: bytes):
-        """Send audio data to Deepgram"""
+    async def send_audio(self, websocket, audio_data: Union[bytes, bytearray, memoryview]):
+        """Send audio data to Deepgram; buffers are passed through without copying"""
         await websocket.send(audio_data)
 
     async def send_tool_result(self, websocket, tool_name: str, result: Dict[str, Any]):
@@ -45,12 +47,12 @@ class DeepgramService:
             "type": "ToolResult",
             "tool": {"name": tool_name, "result": result},
         }
-        await websocket.send(json.dumps(tool_response))
+        await websocket.send(orjson.dumps(tool_response).decode())
 
     @staticmethod
     def parse_message(message: str) -> Dict[str, Any]:
         """Parse incoming message from Deepgram"""
         try:
-            return json.loads(message)
-        except json.JSONDecodeError:
+            return orjson.loads(message)
+        except orjson.JSONDecodeError:
             return {"type": "error", "message": "Invalid JSON"}
@@ -5,8 +5,8 @@ Memory Service for managing agent memories with CRUD operations
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, asc
+from sqlalchemy.orm import Session, defer
+from sqlalchemy import case, func, desc, asc, insert, update
 
 from app.models.database import Memory
 from app.utils.logging_config import app_logger
@@ -53,19 +53,41 @@ class MemorySearchRequest(BaseModel):
     order_by: str = Field(default="importance_desc", pattern="^(importance_desc|importance_asc|created_desc|created_asc|last_used_desc|last_used_asc)$")
 
 
+# Every memory column except the embedding vector, for read-only row queries
+_MEMORY_ROW_COLUMNS = tuple(column for column in Memory.__table__.c if column.name != "embedding")
+
+
 class MemoryService:
     """Service for managing agent memories with full CRUD operations"""
 
+    @staticmethod
+    def _memory_query(db: Session, with_embedding: bool = False, as_rows: bool = False):
+        """
+        Base memory query.
+
+        Rows skip identity-map and attribute instrumentation overhead and expose
+        the same attribute names as Memory, for callers that only read fields.
+        """
+        if as_rows:
+            return db.query(*(Memory.__table__.c if with_embedding else _MEMORY_ROW_COLUMNS))
+
+        query = db.query(Memory)
+        if not with_embedding:
+            query = query.options(defer(Memory.embedding))
+        return query
+
     @staticmethod
     def create_memory(db: Session, req: MemoryCreateRequest) -> Memory:
         """Create a new memory record"""
         try:
-            memory_data = req.dict(exclude_unset=True)
-            memory = Memory(**memory_data)
+            # INSERT ... RETURNING gives back server defaults without a refresh
+            memory = db.scalars(
+                insert(Memory).values(**req.model_dump(exclude_unset=True)).returning(Memory)
+            ).one()
 
-            db.add(memory)
+            # Keep the returned state; committing would expire it and reload on access
+            db.expunge(memory)
             db.commit()
-            db.refresh(memory)
 
             app_logger.info(f"Created memory {memory.id} for agent {req.agent_id}")
             return memory
@@ -98,22 +120,21 @@ class MemoryService:
     def update_memory(db: Session, memory_id: str, req: MemoryUpdateRequest) -> Optional[Memory]:
         """Update an existing memory"""
         try:
-            memory = db.query(Memory).filter(
-                Memory.id == memory_id,
-                Memory.active == True
-            ).first()
+            update_data = req.model_dump(exclude_unset=True, exclude_none=True)
+            memory = db.scalars(
+                update(Memory)
+                .where(Memory.id == memory_id, Memory.active == True)
+                .values(**update_data, updated_at=func.now())
+                .returning(Memory)
+                .execution_options(synchronize_session=False)
+            ).one_or_none()
 
             if not memory:
                 return None
 
-            update_data = req.dict(exclude_unset=True, exclude_none=True)
-
-            for field, value in update_data.items():
-                setattr(memory, field, value)
-
-            memory.updated_at = func.now()
+            # Keep the returned state; committing would expire it and reload on access
+            db.expunge(memory)
             db.commit()
-            db.refresh(memory)
 
             app_logger.info(f"Updated memory {memory_id}")
             return memory
@@ -155,7 +176,9 @@ class MemoryService:
         agent_id: str,
         memory_type: Optional[str] = None,
         limit: int = 10,
-        update_last_used: bool = True
+        update_last_used: bool = True,
+        with_embedding: bool = False,
+        as_rows: bool = False
     ) -> List[Memory]:
         """
         Retrieve memories for an agent (your original function enhanced)
@@ -166,12 +189,14 @@ class MemoryService:
             memory_type: Optional filter by memory type
             limit: Maximum number of memories to return
             update_last_used: Whether to update last_used_at timestamp
+            with_embedding: Whether to load the embedding vector
+            as_rows: Return read-only column rows instead of ORM objects
 
         Returns:
             List of Memory objects ordered by importance desc, created_at desc
         """
         try:
-            query = db.query(Memory).filter(
+            query = MemoryService._memory_query(db, with_embedding, as_rows).filter(
                 Memory.agent_id == agent_id,
                 Memory.active == True
             )
@@ -185,9 +210,13 @@ class MemoryService:
             ).limit(limit).all()
 
             if update_last_used and memories:
-                now = func.now()
-                for mem in memories:
-                    mem.last_used_at = now
+                # One UPDATE for the whole page instead of one per memory
+                db.execute(
+                    update(Memory)
+                    .where(Memory.id.in_([mem.id for mem in memories]))
+                    .values(last_used_at=func.now())
+                    .execution_options(synchronize_session=False)
+                )
                 db.commit()
 
             app_logger.info(f"Retrieved {len(memories)} memories for agent {agent_id}")
@@ -198,10 +227,12 @@ class MemoryService:
             raise
 
     @staticmethod
-    def search_memories(db: Session, req: MemorySearchRequest) -> List[Memory]:
+    def search_memories(
+        db: Session, req: MemorySearchRequest, with_embedding: bool = False, as_rows: bool = False
+    ) -> List[Memory]:
         """Advanced search for memories with multiple filters"""
         try:
-            query = db.query(Memory).filter(
+            query = MemoryService._memory_query(db, with_embedding, as_rows).filter(
                 Memory.agent_id == req.agent_id,
                 Memory.active == True
             )
@@ -262,14 +293,23 @@ class MemoryService:
             raise
 
     @staticmethod
-    def get_memories_by_type(db: Session, agent_id: str, memory_type: str, limit: int = 50) -> List[Memory]:
+    def get_memories_by_type(
+        db: Session,
+        agent_id: str,
+        memory_type: str,
+        limit: int = 50,
+        with_embedding: bool = False,
+        as_rows: bool = False
+    ) -> List[Memory]:
         """Get all memories of a specific type for an agent"""
         try:
-            memories = db.query(Memory).filter(
+            query = MemoryService._memory_query(db, with_embedding, as_rows).filter(
                 Memory.agent_id == agent_id,
                 Memory.memory_type == memory_type,
                 Memory.active == True
-            ).order_by(
+            )
+
+            memories = query.order_by(
                 desc(Memory.importance),
                 desc(Memory.created_at)
             ).limit(limit).all()
@@ -281,13 +321,17 @@ class MemoryService:
             raise
 
     @staticmethod
-    def get_memories_by_conversation(db: Session, conversation_id: str) -> List[Memory]:
+    def get_memories_by_conversation(
+        db: Session, conversation_id: str, with_embedding: bool = False, as_rows: bool = False
+    ) -> List[Memory]:
         """Get all memories linked to a specific conversation"""
         try:
-            memories = db.query(Memory).filter(
+            query = MemoryService._memory_query(db, with_embedding, as_rows).filter(
                 Memory.conversation_id == conversation_id,
                 Memory.active == True
-            ).order_by(desc(Memory.created_at)).all()
+            )
+
+            memories = query.order_by(desc(Memory.created_at)).all()
 
             return memories
 
@@ -300,15 +344,19 @@ class MemoryService:
         db: Session,
         agent_id: str,
         importance_threshold: float = 0.7,
-        limit: int = 20
+        limit: int = 20,
+        with_embedding: bool = False,
+        as_rows: bool = False
     ) -> List[Memory]:
         """Get the most important memories for an agent"""
         try:
-            memories = db.query(Memory).filter(
+            query = MemoryService._memory_query(db, with_embedding, as_rows).filter(
                 Memory.agent_id == agent_id,
                 Memory.importance >= importance_threshold,
                 Memory.active == True
-            ).order_by(
+            )
+
+            memories = query.order_by(
                 desc(Memory.importance),
                 desc(Memory.last_used_at)
             ).limit(limit).all()
@@ -323,22 +371,25 @@ class MemoryService:
     def update_memory_importance(db: Session, memory_id: str, new_importance: float) -> Optional[Memory]:
         """Update the importance score of a memory"""
         try:
-            memory = db.query(Memory).filter(
-                Memory.id == memory_id,
-                Memory.active == True
-            ).first()
+            memory = db.scalars(
+                update(Memory)
+                .where(Memory.id == memory_id, Memory.active == True)
+                .values(
+                    importance=max(0.0, min(1.0, new_importance)),  # Clamp between 0 and 1
+                    updated_at=func.now(),
+                )
+                .returning(Memory)
+                .execution_options(synchronize_session=False)
+            ).one_or_none()
 
             if not memory:
                 return None
 
-            old_importance = memory.importance
-            memory.importance = max(0.0, min(1.0, new_importance))  # Clamp between 0 and 1
-            memory.updated_at = func.now()
-
+            # Keep the returned state; committing would expire it and reload on access
+            db.expunge(memory)
             db.commit()
-            db.refresh(memory)
 
-            app_logger.info(f"Updated memory {memory_id} importance from {old_importance} to {memory.importance}")
+            app_logger.info(f"Updated memory {memory_id} importance to {memory.importance}")
             return memory
 
         except Exception as e:
@@ -346,21 +397,61 @@ class MemoryService:
             app_logger.error(f"Failed to update importance for memory {memory_id}: {str(e)}")
             raise
 
+    @staticmethod
+    def bulk_update_importance(db: Session, importance_by_id: Dict[str, float]) -> int:
+        """
+        Update importance scores for many active memories in one UPDATE.
+
+        Unknown and inactive ids are skipped; returns the number of memories updated.
+        """
+        try:
+            if not importance_by_id:
+                return 0
+
+            # CASE over the ids instead of ORM bulk-by-primary-key, which fails the whole
+            # batch on a single missing row; updated_at is set by the column's onupdate
+            updated_ids = db.execute(
+                update(Memory)
+                .where(Memory.id.in_(list(importance_by_id)), Memory.active == True)
+                .values(
+                    importance=case(
+                        {
+                            memory_id: max(0.0, min(1.0, importance))
+                            for memory_id, importance in importance_by_id.items()
+                        },
+                        value=Memory.id,
+                    )
+                )
+                .returning(Memory.id)
+                .execution_options(synchronize_session=False)
+            ).scalars().all()
+            db.commit()
+
+            app_logger.info(f"Updated importance for {len(updated_ids)} memories")
+            return len(updated_ids)
+
+        except Exception as e:
+            db.rollback()
+            app_logger.error(f"Failed to bulk update memory importance: {str(e)}")
+            raise
+
     @staticmethod
     def bulk_create_memories(db: Session, memories_data: List[MemoryCreateRequest]) -> List[Memory]:
         """Create multiple memories in a single transaction"""
         try:
-            memories = []
-            for req in memories_data:
-                memory_data = req.dict(exclude_unset=True)
-                memory = Memory(**memory_data)
-                memories.append(memory)
+            if not memories_data:
+                return []
 
-            db.add_all(memories)
-            db.commit()
+            # One multi-row INSERT ... RETURNING instead of an insert plus a refresh per row
+            memories = db.scalars(
+                insert(Memory).returning(Memory, sort_by_parameter_order=True),
+                [req.model_dump(exclude_unset=True) for req in memories_data]
+            ).all()
 
+            # Keep the returned state; committing would expire it and reload each row on access
             for memory in memories:
-                db.refresh(memory)
+                db.expunge(memory)
+            db.commit()
 
             app_logger.info(f"Bulk created {len(memories)} memories")
             return memories
@@ -374,41 +465,30 @@ class MemoryService:
     def get_memory_stats(db: Session, agent_id: str) -> Dict[str, Any]:
         """Get statistics about an agent's memories"""
         try:
-            from sqlalchemy import func as sql_func
-
-            total_memories = db.query(Memory).filter(
-                Memory.agent_id == agent_id,
-                Memory.active == True
-            ).count()
-
-            # Count by type
-            type_counts = db.query(
+            # One grouped pass; totals are folded together from the per-type rows
+            type_stats = db.query(
                 Memory.memory_type,
-                sql_func.count(Memory.id).label('count')
+                func.count(Memory.id).label('memory_count'),
+                func.sum(Memory.importance).label('importance_sum'),
+                func.count(Memory.importance).label('importance_count'),
+                func.max(Memory.created_at).label('latest_created_at')
             ).filter(
                 Memory.agent_id == agent_id,
                 Memory.active == True
             ).group_by(Memory.memory_type).all()
 
-            # Average importance
-            avg_importance = db.query(
-                sql_func.avg(Memory.importance)
-            ).filter(
-                Memory.agent_id == agent_id,
-                Memory.active == True
-            ).scalar() or 0.0
-
-            # Most recent memory
-            latest_memory = db.query(Memory).filter(
-                Memory.agent_id == agent_id,
-                Memory.active == True
-            ).order_by(desc(Memory.created_at)).first()
+            importance_sum = sum(t.importance_sum or 0.0 for t in type_stats)
+            importance_count = sum(t.importance_count for t in type_stats)
+            avg_importance = importance_sum / importance_count if importance_count else 0.0
 
             return {
-                "total_memories": total_memories,
-                "memory_types": {t.memory_type: t.count for t in type_counts},
+                "total_memories": sum(t.memory_count for t in type_stats),
+                "memory_types": {t.memory_type: t.memory_count for t in type_stats},
                 "average_importance": round(float(avg_importance), 3),
-                "latest_memory_date": latest_memory.created_at if latest_memory else None
+                "latest_memory_date": max(
+                    (t.latest_created_at for t in type_stats if t.latest_created_at),
+                    default=None
+                )
             }
 
         except Exception as e:
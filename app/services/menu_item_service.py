@@ -3,13 +3,29 @@ MenuItemService for managing restaurant menu items
 """
 
 from typing import List, Optional, Dict, Any
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import func, text, update
 from datetime import datetime
 
-from app.models import MenuItem, Agent
+from app.models import MenuItem
 from app.api.schemas.menu_item import MenuItemCreate, MenuItemUpdate, MenuItemFilter
+from app.utils.context_utils import agent_exists
 from app.utils.logging_config import app_logger
+from app.utils.ttl_cache import TTLCache
+
+
+# Distinct categories per agent; cleared by every write that can change them
+_categories_cache = TTLCache(maxsize=1024, ttl=60)
+
+# Predicate of the ux_menu_items_agent_number partial unique index
+_MENU_NUMBER_INDEX_WHERE = "active AND number IS NOT NULL AND number <> ''"
+
+# Expression of the ix_menu_items_search_trgm index; search must use it verbatim to hit the index
+_SEARCH_DOCUMENT = (
+    "(coalesce(name, '') || ' ' || coalesce(description, '') || ' ' || coalesce(ingredients, ''))"
+)
 
 
 class MenuItemService:
@@ -22,36 +38,28 @@ class MenuItemService:
         """Create a new menu item for an agent"""
         try:
             # Verify agent exists
-            agent = (
-                db.query(Agent)
-                .filter(Agent.id == agent_id, Agent.active == True)
-                .first()
-            )
-            if not agent:
+            if not agent_exists(db, agent_id):
                 raise ValueError(f"Agent with ID {agent_id} not found")
 
-            # Check if menu item number is unique for this agent (if provided)
-            if menu_item_data.number:
-                existing = (
-                    db.query(MenuItem)
-                    .filter(
-                        MenuItem.agent_id == agent_id,
-                        MenuItem.number == menu_item_data.number,
-                        MenuItem.active == True,
-                    )
-                    .first()
+            # Insert, letting the unique number index reject duplicates in the same statement
+            menu_item = db.scalars(
+                pg_insert(MenuItem)
+                .values(agent_id=agent_id, **menu_item_data.model_dump())
+                .on_conflict_do_nothing(
+                    index_elements=["agent_id", "number"],
+                    index_where=text(_MENU_NUMBER_INDEX_WHERE),
+                )
+                .returning(MenuItem)
+            ).first()
+            if menu_item is None:
+                raise ValueError(
+                    f"Menu item number '{menu_item_data.number}' already exists for this agent"
                 )
-                if existing:
-                    raise ValueError(
-                        f"Menu item number '{menu_item_data.number}' already exists for this agent"
-                    )
-
-            # Create new menu item
-            menu_item = MenuItem(agent_id=agent_id, **menu_item_data.model_dump())
 
-            db.add(menu_item)
+            # Keep the returned state; committing would expire it and reload on access
+            db.expunge(menu_item)
             db.commit()
-            db.refresh(menu_item)
+            _categories_cache.pop(agent_id)
 
             app_logger.info(f"Created menu item {menu_item.id} for agent {agent_id}")
             return menu_item
@@ -114,26 +122,30 @@ class MenuItemService:
                 if filters.has_discount is not None:
                     query = query.filter(MenuItem.has_discount == filters.has_discount)
                 if filters.search:
-                    search_term = f"%{filters.search}%"
                     query = query.filter(
-                        or_(
-                            MenuItem.name.ilike(search_term),
-                            MenuItem.description.ilike(search_term),
-                            MenuItem.ingredients.ilike(search_term),
+                        text(f"{_SEARCH_DOCUMENT} ILIKE :search").bindparams(
+                            search=f"%{filters.search}%"
                         )
                     )
 
-            # Get total count
-            total = query.count()
-
-            # Apply pagination
+            # Page rows and the total match count in one query via a window count
             offset = (page - 1) * page_size
-            items = (
-                query.order_by(MenuItem.category, MenuItem.name)
+            rows = (
+                query.add_columns(func.count().over().label("total"))
+                .order_by(MenuItem.category, MenuItem.name)
                 .offset(offset)
                 .limit(page_size)
                 .all()
             )
+            items = [row[0] for row in rows]
+
+            if rows:
+                total = rows[0].total
+            elif offset:
+                # Past the last page the window has no rows to report on
+                total = query.count()
+            else:
+                total = 0
 
             # Calculate pagination info
             total_pages = (total + page_size - 1) // page_size
@@ -156,44 +168,33 @@ class MenuItemService:
     ) -> MenuItem:
         """Update a menu item"""
         try:
-            menu_item = (
-                db.query(MenuItem)
-                .filter(
-                    MenuItem.id == item_id,
-                    MenuItem.agent_id == agent_id,
-                    MenuItem.active == True,
-                )
-                .first()
-            )
-
-            if not menu_item:
-                raise ValueError(f"Menu item {item_id} not found")
-
-            # Check if menu item number is unique for this agent (if being updated)
-            if updates.number and updates.number != menu_item.number:
-                existing = (
-                    db.query(MenuItem)
-                    .filter(
+            # One UPDATE ... RETURNING; the unique number index is the duplicate check
+            update_data = updates.model_dump(exclude_unset=True)
+            try:
+                menu_item = db.scalars(
+                    update(MenuItem)
+                    .where(
+                        MenuItem.id == item_id,
                         MenuItem.agent_id == agent_id,
-                        MenuItem.number == updates.number,
                         MenuItem.active == True,
-                        MenuItem.id != item_id,
                     )
-                    .first()
+                    .values(**update_data, updated_at=datetime.utcnow())
+                    .returning(MenuItem)
+                    .execution_options(synchronize_session=False)
+                ).one_or_none()
+            except IntegrityError:
+                db.rollback()
+                raise ValueError(
+                    f"Menu item number '{updates.number}' already exists for this agent"
                 )
-                if existing:
-                    raise ValueError(
-                        f"Menu item number '{updates.number}' already exists for this agent"
-                    )
 
-            # Apply updates
-            update_data = updates.model_dump(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(menu_item, field, value)
+            if not menu_item:
+                raise ValueError(f"Menu item {item_id} not found")
 
-            menu_item.updated_at = datetime.utcnow()
+            # Keep the returned state; committing would expire it and reload on access
+            db.expunge(menu_item)
             db.commit()
-            db.refresh(menu_item)
+            _categories_cache.pop(agent_id)
 
             app_logger.info(f"Updated menu item {item_id} for agent {agent_id}")
             return menu_item
@@ -207,22 +208,23 @@ class MenuItemService:
     def delete_menu_item(db: Session, agent_id: str, item_id: str) -> bool:
         """Soft delete a menu item"""
         try:
-            menu_item = (
-                db.query(MenuItem)
-                .filter(
+            deleted_id = db.execute(
+                update(MenuItem)
+                .where(
                     MenuItem.id == item_id,
                     MenuItem.agent_id == agent_id,
                     MenuItem.active == True,
                 )
-                .first()
-            )
+                .values(active=False, updated_at=datetime.utcnow())
+                .returning(MenuItem.id)
+                .execution_options(synchronize_session=False)
+            ).scalar_one_or_none()
 
-            if not menu_item:
+            if not deleted_id:
                 raise ValueError(f"Menu item {item_id} not found")
 
-            menu_item.active = False
-            menu_item.updated_at = datetime.utcnow()
             db.commit()
+            _categories_cache.pop(agent_id)
 
             app_logger.info(f"Deleted menu item {item_id} for agent {agent_id}")
             return True
@@ -238,34 +240,32 @@ class MenuItemService:
     ) -> List[MenuItem]:
         """Bulk update multiple menu items"""
         try:
-            menu_items = (
-                db.query(MenuItem)
-                .filter(
+            # One UPDATE for every item; RETURNING doubles as the existence check
+            update_data = updates.model_dump(exclude_unset=True)
+            menu_items = db.scalars(
+                update(MenuItem)
+                .where(
                     MenuItem.id.in_(item_ids),
                     MenuItem.agent_id == agent_id,
                     MenuItem.active == True,
                 )
-                .all()
-            )
+                .values(**update_data, updated_at=datetime.utcnow())
+                .returning(MenuItem)
+                .execution_options(synchronize_session=False)
+            ).all()
 
-            if len(menu_items) != len(item_ids):
-                found_ids = [item.id for item in menu_items]
+            if len(menu_items) != len(set(item_ids)):
+                found_ids = {item.id for item in menu_items}
                 missing_ids = [
                     item_id for item_id in item_ids if item_id not in found_ids
                 ]
                 raise ValueError(f"Menu items not found: {missing_ids}")
 
-            # Apply updates to all items
-            update_data = updates.model_dump(exclude_unset=True)
+            # Keep the returned state; committing would expire it and reload each row
             for menu_item in menu_items:
-                for field, value in update_data.items():
-                    setattr(menu_item, field, value)
-                menu_item.updated_at = datetime.utcnow()
-
+                db.expunge(menu_item)
             db.commit()
-
-            for menu_item in menu_items:
-                db.refresh(menu_item)
+            _categories_cache.pop(agent_id)
 
             app_logger.info(
                 f"Bulk updated {len(menu_items)} menu items for agent {agent_id}"
@@ -282,6 +282,10 @@ class MenuItemService:
     @staticmethod
     def get_menu_categories(db: Session, agent_id: str) -> List[str]:
         """Get all unique categories for an agent's menu"""
+        cached = _categories_cache.get(agent_id)
+        if cached is not None:
+            return list(cached)
+
         try:
             categories = (
                 db.query(MenuItem.category)
@@ -290,7 +294,9 @@ class MenuItemService:
                 .all()
             )
 
-            return [str(cat[0]) for cat in categories if cat[0]]
+            category_names = [str(cat[0]) for cat in categories if cat[0]]
+            _categories_cache.set(agent_id, tuple(category_names))
+            return category_names
 
         except Exception as e:
             app_logger.error(
@@ -302,23 +308,25 @@ class MenuItemService:
     def toggle_availability(db: Session, agent_id: str, item_id: str) -> MenuItem:
         """Toggle the availability status of a menu item"""
         try:
-            menu_item = (
-                db.query(MenuItem)
-                .filter(
+            # Flip in SQL so the read and the write are one atomic statement
+            menu_item = db.scalars(
+                update(MenuItem)
+                .where(
                     MenuItem.id == item_id,
                     MenuItem.agent_id == agent_id,
                     MenuItem.active == True,
                 )
-                .first()
-            )
+                .values(available=~MenuItem.available, updated_at=datetime.utcnow())
+                .returning(MenuItem)
+                .execution_options(synchronize_session=False)
+            ).one_or_none()
 
             if not menu_item:
                 raise ValueError(f"Menu item {item_id} not found")
 
-            menu_item.available = not menu_item.available
-            menu_item.updated_at = datetime.utcnow()
+            # Keep the returned state; committing would expire it and reload on access
+            db.expunge(menu_item)
             db.commit()
-            db.refresh(menu_item)
 
             app_logger.info(
                 f"Toggled availability for menu item {item_id} to {menu_item.available}"
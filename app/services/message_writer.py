@@ -0,0 +1,199 @@
+"""
+Batched message persistence for live calls.
+
+Transcript messages arrive on every conversational turn. Instead of a
+commit per utterance, they are queued and written in batches: one counter
+UPDATE and one multi-row INSERT per conversation, one commit.
+"""
+
+import asyncio
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from app.models import Conversation, Message
+from app.models.database import get_db_session
+from app.utils.logging_config import app_logger as logger
+
+
+class MessageWriter:
+    """Queue conversation messages and flush them to the database in batches"""
+
+    def __init__(self, flush_interval: float = 0.25, max_batch_size: int = 50):
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Future] = set()
+
+    def start(self):
+        """Start the background flush loop on the running event loop"""
+        if self._task and not self._task.done():
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Message writer started")
+
+    async def stop(self):
+        """Write everything still queued, then stop the flush loop"""
+        await self.flush()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        logger.info("Message writer stopped")
+
+    async def enqueue(
+        self,
+        conversation_id: str,
+        role: str,
+        content: str,
+        message_type: str = "conversation",
+        audio_file_path: Optional[str] = None,
+    ) -> Tuple[str, "asyncio.Future[int]"]:
+        """
+        Queue a message for writing.
+
+        Returns the message id, assigned up front, and a future that resolves
+        to the message's sequence number once it has been committed.
+        """
+        if not self._task or self._task.done():
+            self.start()
+        assert self._queue is not None
+
+        now = datetime.now(timezone.utc)
+        row: Dict[str, Any] = {
+            "id": str(uuid.uuid4()),
+            "conversation_id": conversation_id,
+            "role": role,
+            "content": content,
+            "audio_file_path": audio_file_path,
+            "message_type": message_type,
+            "created_at": now,
+            "updated_at": now,
+        }
+        written: "asyncio.Future[int]" = asyncio.get_running_loop().create_future()
+        self._pending.add(written)
+        written.add_done_callback(self._pending.discard)
+
+        await self._queue.put((row, written))
+        return row["id"], written
+
+    async def flush(self):
+        """Wait until every message queued so far has been written"""
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    async def _run(self):
+        """Collect messages for up to flush_interval seconds, then write them"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            rows = [row for row, _ in batch]
+            try:
+                failures = await asyncio.to_thread(self._write_batch, rows)
+            except Exception as e:
+                logger.exception("Failed to write %d queued messages: %s", len(rows), e)
+                for _, written in batch:
+                    if not written.done():
+                        written.set_exception(e)
+                continue
+
+            for row, written in batch:
+                if written.done():
+                    continue
+                error = failures.get(row["id"])
+                if error is not None:
+                    written.set_exception(error)
+                else:
+                    written.set_result(row["sequence_number"])
+
+    @staticmethod
+    def _write_batch(rows: List[Dict[str, Any]]) -> Dict[str, Exception]:
+        """
+        Write a batch in one transaction, isolating failures per conversation.
+
+        Each conversation is written under its own savepoint, so a bad row cannot
+        discard other calls' messages; if a conversation's block fails, its rows
+        are retried one by one. Returns the errors of rows that could not be
+        written, keyed on message id.
+        """
+        rows_by_conversation: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            rows_by_conversation[row["conversation_id"]].append(row)
+
+        failures: Dict[str, Exception] = {}
+        db_session = get_db_session()
+        try:
+            for conversation_id, conversation_rows in rows_by_conversation.items():
+                try:
+                    with db_session.begin_nested():
+                        MessageWriter._insert_rows(db_session, conversation_id, conversation_rows)
+                    continue
+                except Exception as e:
+                    if len(conversation_rows) == 1:
+                        failures[conversation_rows[0]["id"]] = e
+                        logger.error("Failed to write message for conversation %s: %s", conversation_id, e)
+                        continue
+                    logger.warning(
+                        "Retrying %d messages for conversation %s one by one: %s",
+                        len(conversation_rows),
+                        conversation_id,
+                        e,
+                    )
+
+                for row in conversation_rows:
+                    try:
+                        with db_session.begin_nested():
+                            MessageWriter._insert_rows(db_session, conversation_id, [row])
+                    except Exception as e:
+                        failures[row["id"]] = e
+                        logger.error("Failed to write message %s: %s", row["id"], e)
+
+            db_session.commit()
+            logger.info("Wrote %d queued messages", len(rows) - len(failures))
+            return failures
+        except Exception:
+            db_session.rollback()
+            raise
+        finally:
+            db_session.close()
+
+    @staticmethod
+    def _insert_rows(db_session: Session, conversation_id: str, rows: List[Dict[str, Any]]):
+        """Reserve a contiguous block of sequence numbers and insert one conversation's rows"""
+        last_sequence = db_session.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(message_count=Conversation.message_count + len(rows))
+            .returning(Conversation.message_count)
+            .execution_options(synchronize_session=False)
+        ).scalar_one()
+
+        # Queue order is arrival order, so numbering preserves it
+        for sequence_number, row in enumerate(rows, last_sequence - len(rows) + 1):
+            row["sequence_number"] = sequence_number
+
+        db_session.execute(insert(Message), rows)
+
+
+# Process-wide writer shared by all call sessions
+message_writer = MessageWriter()
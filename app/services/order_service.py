@@ -1,59 +1,36 @@
 from datetime import datetime, date, timezone
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import delete, insert, tuple_, update
+from sqlalchemy.orm import Session, selectinload
 
-from app.models import Agent, Order, OrderItem, Conversation
+from app.models import Order, OrderItem, Conversation
+from app.utils.context_utils import agent_exists
 from app.utils.logging_config import app_logger
 
 
 class OrderService:
     """Service for managing orders directly linked to agents"""
 
-    db: Session
-
-    def create_preemptive_order(self, conversation: Conversation) -> None:
-        """Create a preemptive order when a conversation starts"""
-        try:
-            from app.models import Order
-
-            preemptive_order = Order(
-                agent_id=conversation.agent_id,
-                conversation_id=conversation.id,
-                customer_phone=conversation.caller_phone,
-                customer_name="",
-                status="new",
-                total_price=0.0,
-                active=False,
-            )
-            self.db.add(preemptive_order)
-            self.db.commit()
-
-            app_logger.info(
-                f"Created preemptive order for conversation {conversation.id}"
-            )
-
-        except Exception as e:
-            # Don't fail the conversation creation if order creation fails
-            app_logger.error(
-                f"Failed to create preemptive order for conversation {conversation.id}: {str(e)}"
-            )
-            # Rollback any partial order creation, but keep the conversation
-            self.db.rollback()
-            # Re-commit the conversation
-            self.db.commit()
+    @staticmethod
+    def build_preemptive_order(conversation: Conversation) -> Order:
+        """Build the empty, inactive order that a voice conversation starts with"""
+        return Order(
+            agent_id=conversation.agent_id,
+            conversation_id=conversation.id,
+            customer_phone=conversation.caller_phone,
+            customer_name="",
+            status="new",
+            total_price=0.0,
+            active=False,
+        )
 
     @staticmethod
     def create_order(db: Session, agent_id: str, order_data: Dict[str, Any]) -> Order:
         """Create a new order for an agent"""
         try:
             # Verify agent exists
-            agent = (
-                db.query(Agent)
-                .filter(Agent.id == agent_id, Agent.active == True)
-                .first()
-            )
-            if not agent:
+            if not agent_exists(db, agent_id):
                 raise ValueError(f"Agent with ID {agent_id} not found")
 
             # Extract order items data
@@ -61,19 +38,13 @@ class OrderService:
             if not order_items_data:
                 raise ValueError("Cannot create an order with no items")
 
-            # Calculate total price from items
-            total_price = sum(
-                item["quantity"] * item["price"] for item in order_items_data
-            )
-
-            # Create order
+            # Create order; total_price is set by the order_items trigger as items are inserted
             new_order = Order(
                 agent_id=agent_id,
                 conversation_id=order_data["conversation_id"],
                 customer_phone=order_data.get("customer_phone"),
                 customer_name=order_data.get("customer_name"),
                 status=order_data.get("status", "new"),
-                total_price=total_price,
                 pickup_time=order_data.get("pickup_time"),
                 special_requests=order_data.get("special_requests"),
             )
@@ -81,16 +52,20 @@ class OrderService:
             db.add(new_order)
             db.flush()  # Get the order ID
 
-            # Create order items
-            for item_data in order_items_data:
-                order_item = OrderItem(
-                    order_id=new_order.id,
-                    name=item_data["name"],
-                    quantity=item_data["quantity"],
-                    price=item_data["price"],
-                    note=item_data.get("note"),
-                )
-                db.add(order_item)
+            # Create order items in one batched INSERT
+            db.execute(
+                insert(OrderItem),
+                [
+                    {
+                        "order_id": new_order.id,
+                        "name": item_data["name"],
+                        "quantity": item_data["quantity"],
+                        "price": item_data["price"],
+                        "note": item_data.get("note"),
+                    }
+                    for item_data in order_items_data
+                ],
+            )
 
             db.commit()
             db.refresh(new_order)
@@ -108,7 +83,7 @@ class OrderService:
         """Get a specific order by ID with items loaded"""
         return (
             db.query(Order)
-            .options(joinedload(Order.order_items))
+            .options(selectinload(Order.order_items))
             .filter(Order.id == order_id, Order.active == True)
             .first()
         )
@@ -119,22 +94,24 @@ class OrderService:
         agent_id: str,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
+        limit: Optional[int] = None,
+        before: Optional[Tuple[datetime, str]] = None,
     ) -> List[Order]:
-        """Get all orders for a specific agent with optional date filtering"""
+        """
+        Get orders for a specific agent with optional date filtering.
+
+        Orders come newest first. Pass limit to cap the page size and before,
+        the (created_at, id) of the last order seen, to fetch the next page.
+        """
         try:
             # Verify agent exists
-            agent = (
-                db.query(Agent)
-                .filter(Agent.id == agent_id, Agent.active == True)
-                .first()
-            )
-            if not agent:
+            if not agent_exists(db, agent_id):
                 raise ValueError(f"Agent with ID {agent_id} not found")
 
             # Build query
             query = (
                 db.query(Order)
-                .options(joinedload(Order.order_items))
+                .options(selectinload(Order.order_items))
                 .filter(Order.agent_id == agent_id, Order.active == True)
             )
 
@@ -147,7 +124,15 @@ class OrderService:
                 end_datetime = datetime.combine(end_date, datetime.max.time())
                 query = query.filter(Order.created_at <= end_datetime)
 
-            orders = query.order_by(Order.created_at.desc()).all()
+            # Keyset pagination: resume strictly after the last order seen
+            if before:
+                query = query.filter(tuple_(Order.created_at, Order.id) < tuple_(*before))
+
+            query = query.order_by(Order.created_at.desc(), Order.id.desc())
+            if limit:
+                query = query.limit(limit)
+
+            orders = query.all()
 
             app_logger.info(f"Retrieved {len(orders)} orders for agent {agent_id}")
             return orders
@@ -162,7 +147,7 @@ class OrderService:
         try:
             order = (
                 db.query(Order)
-                .options(joinedload(Order.order_items))
+                .options(selectinload(Order.order_items))
                 .filter(Order.id == order_id, Order.active == True)
                 .first()
             )
@@ -202,23 +187,31 @@ class OrderService:
     ) -> OrderItem:
         """Update an order item's details"""
         try:
-            order_item = db.query(OrderItem).filter(OrderItem.id == item_id).first()
-            if not order_item:
-                raise ValueError(f"Order item {item_id} not found")
-
             # Update allowed fields
             allowed_fields = ["name", "quantity", "price", "note"]
-            for field, value in updates.items():
-                if field in allowed_fields:
-                    setattr(order_item, field, value)
+            item_updates = {
+                field: value for field, value in updates.items() if field in allowed_fields
+            }
+
+            if item_updates:
+                order_item = db.scalars(
+                    update(OrderItem)
+                    .where(OrderItem.id == item_id)
+                    .values(**item_updates)
+                    .returning(OrderItem)
+                    .execution_options(synchronize_session=False)
+                ).one_or_none()
+            else:
+                order_item = db.get(OrderItem, item_id)
+            if not order_item:
+                raise ValueError(f"Order item {item_id} not found")
 
             # Update the parent order's updated_at timestamp
-            order = db.query(Order).filter(Order.id == order_item.order_id).first()
-            if order:
-                order.updated_at = datetime.now(timezone.utc)
+            OrderService._touch_order(db, order_item.order_id)
 
+            # Keep the returned state; committing would expire it and reload on access
+            db.expunge(order_item)
             db.commit()
-            db.refresh(order_item)
 
             app_logger.info(f"Updated order item {item_id}")
             return order_item
@@ -232,19 +225,17 @@ class OrderService:
     def delete_order_item(db: Session, item_id: str) -> bool:
         """Delete an order item"""
         try:
-            order_item = db.query(OrderItem).filter(OrderItem.id == item_id).first()
-            if not order_item:
+            order_id = db.execute(
+                delete(OrderItem)
+                .where(OrderItem.id == item_id)
+                .returning(OrderItem.order_id)
+                .execution_options(synchronize_session=False)
+            ).scalar_one_or_none()
+            if not order_id:
                 raise ValueError(f"Order item {item_id} not found")
 
-            order_id = order_item.order_id
-
-            # Delete the item
-            db.delete(order_item)
-
             # Update the parent order's updated_at timestamp
-            order = db.query(Order).filter(Order.id == order_id).first()
-            if order:
-                order.updated_at = datetime.now(timezone.utc)
+            OrderService._touch_order(db, order_id)
 
             db.commit()
 
@@ -256,18 +247,20 @@ class OrderService:
             app_logger.error(f"Error deleting order item {item_id}: {str(e)}")
             raise
 
+    @staticmethod
+    def _touch_order(db: Session, order_id: str):
+        """Bump an order's updated_at without loading it"""
+        db.execute(
+            update(Order)
+            .where(Order.id == order_id)
+            .values(updated_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+
     @staticmethod
     def update_order_status(db: Session, order_id: str, new_status: str) -> Order:
         """Update an order's status"""
         try:
-            order = (
-                db.query(Order)
-                .filter(Order.id == order_id, Order.active == True)
-                .first()
-            )
-            if not order:
-                raise ValueError(f"Order {order_id} not found")
-
             # Valid statuses
             valid_statuses = ["new", "in_progress", "ready", "completed", "cancelled"]
             if new_status not in valid_statuses:
@@ -275,11 +268,18 @@ class OrderService:
                     f"Invalid status: {new_status}. Must be one of {valid_statuses}"
                 )
 
-            order.status = new_status
-            order.updated_at = datetime.now(timezone.utc)
+            order = db.scalars(
+                update(Order)
+                .where(Order.id == order_id, Order.active == True)
+                .values(status=new_status, updated_at=datetime.now(timezone.utc))
+                .returning(Order)
+                .execution_options(synchronize_session=False)
+            ).one_or_none()
+            if not order:
+                raise ValueError(f"Order {order_id} not found")
 
+            # Stays attached: the response serializes order_items, loaded on access
             db.commit()
-            db.refresh(order)
 
             app_logger.info(f"Updated order {order_id} status to {new_status}")
             return order
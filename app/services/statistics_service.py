@@ -1,7 +1,7 @@
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, Tuple
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import Row, and_, case, exists, func
 
 from app.models.database import Conversation
 from app.api.schemas.statistics_schemas import (
@@ -44,11 +44,10 @@ class StatisticsService:
         previous_end = start_date - timedelta(seconds=1)
         previous_start = previous_end - period_duration
 
-        # Get current period stats
-        current_stats = self._get_period_stats(agent_id, start_date, end_date)
-
-        # Get previous period stats
-        previous_stats = self._get_period_stats(agent_id, previous_start, previous_end)
+        # Get current and previous period stats in one pass
+        current_stats, previous_stats = self._get_two_period_stats(
+            agent_id, previous_start, previous_end, start_date, end_date
+        )
 
         # Build response
         return AgentStatistics(
@@ -69,122 +68,114 @@ class StatisticsService:
             },
         )
 
-    def _get_period_stats(
-        self, agent_id: str, start_date: datetime, end_date: datetime
-    ) -> Dict[str, Any]:
-        """Get raw statistics for a specific period"""
-
-        # Base conversation query for the period
-        base_query = self.db.query(Conversation).filter(
-            and_(
-                Conversation.agent_id == agent_id,
-                Conversation.created_at >= start_date,
-                Conversation.created_at <= end_date,
-                Conversation.active == True,
-            )
+    def _get_two_period_stats(
+        self,
+        agent_id: str,
+        previous_start: datetime,
+        previous_end: datetime,
+        start_date: datetime,
+        end_date: datetime,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Get raw statistics for the current and previous periods"""
+
+        range_filter = and_(
+            Conversation.agent_id == agent_id,
+            Conversation.created_at >= previous_start,
+            Conversation.created_at <= end_date,
+            Conversation.active == True,
         )
 
-        # Total conversations
-        total_conversations = base_query.count()
-
-        # Conversations by type
-        voice_conversations = base_query.filter(
-            Conversation.conversation_type == "voice"
-        ).count()
-
-        message_conversations = base_query.filter(
-            or_(
-                Conversation.conversation_type == "sms",
-                Conversation.conversation_type == "message",
-            )
-        ).count()
-
-        # Duration calculations (only for voice calls)
-        voice_durations = (
-            self.db.query(Conversation.duration_seconds)
-            .filter(
-                and_(
-                    Conversation.agent_id == agent_id,
-                    Conversation.conversation_type == "voice",
-                    Conversation.created_at >= start_date,
-                    Conversation.created_at <= end_date,
-                    Conversation.duration_seconds.isnot(None),
-                    Conversation.active == True,
-                )
+        # Counts and voice duration for both periods in one pass, one row per period
+        period = case(
+            (Conversation.created_at >= start_date, "current"),
+            (Conversation.created_at <= previous_end, "previous"),
+        ).label("period")
+        totals = {
+            row.period: row
+            for row in self.db.query(
+                period,
+                func.count().label("total"),
+                func.count()
+                .filter(Conversation.conversation_type == "voice")
+                .label("voice"),
+                func.count()
+                .filter(Conversation.conversation_type.in_(["sms", "message"]))
+                .label("messages"),
+                func.coalesce(
+                    func.sum(Conversation.duration_seconds).filter(
+                        Conversation.conversation_type == "voice"
+                    ),
+                    0,
+                ).label("voice_seconds"),
             )
+            .filter(range_filter)
+            .group_by(period)
             .all()
-        )
-
-        # Convert duration strings to minutes
-        total_voice_minutes = 0.0
-        for duration_tuple in voice_durations:
-            duration_str = duration_tuple[0]
-            if duration_str:
-                try:
-                    # Assuming duration_seconds is stored as string
-                    total_voice_minutes += float(duration_str) / 60.0
-                except (ValueError, TypeError):
-                    continue
-
-        # Unique caller analysis
-        unique_callers = (
-            self.db.query(Conversation.caller_phone)
-            .filter(
-                and_(
-                    Conversation.agent_id == agent_id,
-                    Conversation.created_at >= start_date,
-                    Conversation.created_at <= end_date,
-                    Conversation.active == True,
-                )
-            )
-            .distinct()
-            .count()
-        )
+        }
 
-        # Get all callers in this period
-        current_callers = set(
-            row[0]
-            for row in self.db.query(Conversation.caller_phone)
-            .filter(
-                and_(
-                    Conversation.agent_id == agent_id,
-                    Conversation.created_at >= start_date,
-                    Conversation.created_at <= end_date,
-                    Conversation.active == True,
+        # One row per caller across both periods, flagged by when they called.
+        # GROUP BY dedups callers (and parallelizes) where COUNT(DISTINCT) cannot;
+        # the EXISTS is one probe of ix_conversations_caller_created, not a history scan.
+        prior = aliased(Conversation)
+        caller_rows = (
+            self.db.query(
+                Conversation.caller_phone,
+                func.bool_or(Conversation.created_at <= previous_end).label("in_previous"),
+                func.bool_or(Conversation.created_at < start_date).label("before_current"),
+                func.bool_or(Conversation.created_at >= start_date).label("in_current"),
+                exists()
+                .where(
+                    prior.agent_id == agent_id,
+                    prior.caller_phone == Conversation.caller_phone,
+                    prior.created_at < previous_start,
+                    prior.active == True,
                 )
+                .label("before_previous"),
             )
-            .distinct()
+            .filter(range_filter)
+            .group_by(Conversation.caller_phone)
             .all()
         )
 
-        # Get callers who called before this period (returning callers)
-        previous_callers = set(
-            row[0]
-            for row in self.db.query(Conversation.caller_phone)
-            .filter(
-                and_(
-                    Conversation.agent_id == agent_id,
-                    Conversation.created_at < start_date,
-                    Conversation.active == True,
-                )
-            )
-            .distinct()
-            .all()
+        previous_callers = {
+            row.caller_phone: row.before_previous for row in caller_rows if row.in_previous
+        }
+        current_callers = {
+            row.caller_phone: row.before_previous or row.before_current
+            for row in caller_rows
+            if row.in_current
+        }
+
+        return (
+            self._period_stats(
+                totals.get("current"), current_callers, start_date, end_date
+            ),
+            self._period_stats(
+                totals.get("previous"), previous_callers, previous_start, previous_end
+            ),
         )
 
-        returning_callers = len(current_callers.intersection(previous_callers))
-        new_callers = len(current_callers - previous_callers)
+    def _period_stats(
+        self,
+        totals: Optional[Row],
+        callers: Dict[str, bool],
+        start_date: datetime,
+        end_date: datetime,
+    ) -> Dict[str, Any]:
+        """Assemble one period's raw statistics from its aggregate row and callers"""
+        total_voice_minutes = (totals.voice_seconds / 60.0) if totals else 0.0
+        returning_callers = sum(1 for is_returning in callers.values() if is_returning)
 
         return {
-            "total_conversations": total_conversations,
-            "voice_conversations": voice_conversations,
-            "message_conversations": message_conversations,
+            "total_conversations": totals.total if totals else 0,
+            "voice_conversations": totals.voice if totals else 0,
+            "message_conversations": totals.messages if totals else 0,
             "total_voice_minutes": total_voice_minutes,
             "total_minutes": total_voice_minutes,  # Same as voice for now
-            "unique_callers": unique_callers,
+            "unique_callers": len(callers),
             "returning_callers": returning_callers,
-            "new_callers": new_callers,
-            "current_callers": current_callers,
+            "new_callers": len(callers) - returning_callers,
+            "current_callers": set(callers),
             "period_start": start_date,
             "period_end": end_date,
         }
@@ -1,16 +1,26 @@
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 
-from jose import jwt
+import time
+
+from jose import jwk, jwt
 from sqlalchemy.orm import Session
 
 from app.config.settings import settings
 from app.models import User
+from app.utils.ttl_cache import TTLCache
 
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 5
 
+# Signing key and accepted algorithms, built once instead of per token
+_SIGNING_KEY = jwk.construct(SECRET_KEY, ALGORITHM)
+_ALGORITHMS = (ALGORITHM,)
+
+# Decoded payloads of recently verified tokens; a request burst verifies the signature once
+_verified_tokens = TTLCache(maxsize=4096, ttl=30)
+
 
 class UserService:
     """Service for user management and authentication (firebase-based)"""
@@ -25,16 +35,21 @@ class UserService:
             expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         )
         to_encode.update({"exp": expire})
-        return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+        return jwt.encode(to_encode, _SIGNING_KEY, algorithm=ALGORITHM)
 
     @staticmethod
     def verify_token(token: str) -> Optional[Dict[str, Any]]:
         """Verify and decode a JWT token"""
-        try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = _verified_tokens.get(token)
+        if payload is not None and payload.get("exp", float("inf")) > time.time():
             return payload
+
+        try:
+            payload = jwt.decode(token, _SIGNING_KEY, algorithms=_ALGORITHMS)
         except Exception:
             return None
+        _verified_tokens.set(token, payload)
+        return payload
 
     @staticmethod
     def upsert_user(db: Session, user_data: Dict[str, Any]) -> User:
@@ -99,11 +99,9 @@ async def add_order_item(args: Dict[str, Any]) -> Dict[str, Any]:
             )
 
             db.add(order_item)
-
-            # Update order total
             item_total = menu_item.price * quantity
-            order.total_price = (order.total_price or 0) + item_total
 
+            # The order_items trigger updates the order total
             db.commit()
             db.refresh(order_item)
 
@@ -229,9 +227,7 @@ async def remove_order_item(args: Dict[str, Any]) -> Dict[str, Any]:
                 if quantity_to_remove == 0:
                     break
 
-            # Update order total
-            order.total_price = max(0, (order.total_price or 0) - total_refund)
-
+            # The order_items trigger updates the order total
             db.commit()
 
             return {
@@ -327,7 +323,6 @@ async def update_order_item(args: Dict[str, Any]) -> Dict[str, Any]:
             if not order_item:
                 return {"error": f"Item '{item_name}' not found in order {order_id}"}
 
-            old_total = order_item.price * order_item.quantity
             changes = []
 
             # Update quantity if provided
@@ -342,11 +337,9 @@ async def update_order_item(args: Dict[str, Any]) -> Dict[str, Any]:
                 order_item.note = new_notes
                 changes.append(f"notes: '{old_notes}' → '{new_notes}'")
 
-            # Recalculate order total
             new_item_total = order_item.price * order_item.quantity
-            total_difference = new_item_total - old_total
-            order.total_price = (order.total_price or 0) + total_difference
 
+            # The order_items trigger updates the order total
             db.commit()
 
             return {
@@ -528,11 +521,8 @@ async def finalize_order(args: Dict[str, Any]) -> Dict[str, Any]:
             order.confirmed_at = confirmed_at
             order.updated_at = confirmed_at
 
-            # Recalculate final total
-            final_total = sum(item.price * item.quantity for item in order_items)
-            order.total_price = final_total
-
             db.commit()
+            final_total = order.total_price or 0
 
             return {
                 "success": True,
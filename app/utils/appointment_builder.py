@@ -5,6 +5,7 @@ Appointment context builder utility
 from typing import Optional, List
 from datetime import datetime
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.models import Agent, Event
 from app.utils.logging_config import app_logger
@@ -19,7 +20,7 @@ def build_appointment_context(
     Build appointment booking context with practical function call examples
     and upcoming appointments for the caller
     """
-    if not getattr(agent, 'booking_enabled', True) or not agent.calendar_id:
+    if not agent.booking_enabled or not agent.calendar_id:
         return ""
 
     # Extract attendee emails from agent.invitees for realistic examples (team members)
@@ -204,6 +205,6 @@ def _get_caller_upcoming_appointments(
             .all()
         )
         return appointments
-    except Exception as e:
-        app_logger.error(f"Error fetching caller appointments: {str(e)}")
+    except (SQLAlchemyError, ValueError, TypeError, KeyError):
+        app_logger.exception("Error fetching caller appointments")
         return []
@@ -4,24 +4,36 @@ Context formatting utilities for agent configuration
 
 from datetime import datetime
 
+# Index 0 is unused so ISO weekday numbers (1 = Monday) index directly
+_DAY_NAMES = ("", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+_INDICATOR_LABELS = (
+    ("is_popular", "POPULAR"),
+    ("is_special", "SPECIAL"),
+    ("is_new", "NEW"),
+    ("is_limited_time", "LIMITED"),
+)
+
+
+def _day_name(day) -> str:
+    """Name for an ISO weekday number, falling back to the raw value"""
+    if type(day) is int and 1 <= day <= 7:
+        return _DAY_NAMES[day]
+    return str(day)
+
 
 def format_business_context(agent) -> str:
     """Format business details into context string"""
     context_parts = []
 
     # Business name and type
-    business_name = getattr(agent, 'business_name', None) or agent.name or "the business"
+    business_name = agent.business_name or agent.name or "the business"
     context_parts.append(f"Business: {business_name}")
 
     # Business hours
     if agent.business_hours:
-        days_map = {
-            1: "Monday", 2: "Tuesday", 3: "Wednesday", 4: "Thursday",
-            5: "Friday", 6: "Saturday", 7: "Sunday"
-        }
         business_days = [
-            days_map.get(day, str(day))
-            for day in agent.business_hours.get("days", [1, 2, 3, 4, 5])
+            _day_name(day) for day in agent.business_hours.get("days", [1, 2, 3, 4, 5])
         ]
         start_time = agent.business_hours.get("start", "09:00")
         end_time = agent.business_hours.get("end", "17:00")
@@ -56,33 +68,37 @@ def format_business_context(agent) -> str:
     return " | ".join(context_parts)
 
 
-def format_conversation_item(conv, index: int) -> str:
+def format_conversation_item(conv, index: int, now: datetime = None) -> str:
     """Format a single conversation for history display"""
-    days_ago = (datetime.now() - conv.created_at).days
+    days_ago = ((now or datetime.now()) - conv.created_at).days
     time_desc = "today" if days_ago == 0 else f"{days_ago} days ago"
 
-    text = f"{index}. {time_desc}: {conv.summary}\n"
     if conv.conversation_type:
-        text += f"   Type: {conv.conversation_type}\n"
-    return text
+        return f"{index}. {time_desc}: {conv.summary}\n   Type: {conv.conversation_type}\n"
+    return f"{index}. {time_desc}: {conv.summary}\n"
 
 
-def format_order_item(order, index: int) -> str:
+def format_order_item(order, index: int, order_items=None, now: datetime = None) -> str:
     """Format a single order for history display"""
-    days_ago = (datetime.now() - order.created_at).days
+    if order_items is None:
+        order_items = order.order_items
+
+    days_ago = ((now or datetime.now()) - order.created_at).days
     time_desc = "today" if days_ago == 0 else f"{days_ago} days ago"
 
-    text = f"{index}. {time_desc} - ${order.total_price:.2f} ({order.status})\n"
+    lines = [f"{index}. {time_desc} - ${order.total_price:.2f} ({order.status})\n"]
 
     # Add order items
-    if order.order_items:
-        for item in order.order_items[:3]:  # Show max 3 items
-            text += f"   • {item.quantity}x {item.name} @ ${item.price:.2f}\n"
+    if order_items:
+        lines.extend(
+            f"   • {item.quantity}x {item.name} @ ${item.price:.2f}\n"
+            for item in order_items[:3]  # Show max 3 items
+        )
 
-        if len(order.order_items) > 3:
-            text += f"   ... and {len(order.order_items) - 3} more items\n"
+        if len(order_items) > 3:
+            lines.append(f"   ... and {len(order_items) - 3} more items\n")
 
-    return text
+    return "".join(lines)
 
 
 def format_current_order_context(order) -> str:
@@ -119,28 +135,12 @@ def format_current_order_context(order) -> str:
 
 def format_menu_item(item) -> str:
     """Format a single menu item"""
-    text = f"• Item Id: {item.id} - {item.name} - ${item.price:.2f}"
-
-    if item.number:
-        text += f" (#{item.number})"
+    number = f" (#{item.number})" if item.number else ""
 
     # Add special indicators
-    indicators = []
-    if item.is_popular:
-        indicators.append("POPULAR")
-    if item.is_special:
-        indicators.append("SPECIAL")
-    if item.is_new:
-        indicators.append("NEW")
-    if item.is_limited_time:
-        indicators.append("LIMITED")
-
-    if indicators:
-        text += f" [{', '.join(indicators)}]"
-
-    text += "\n"
+    indicators = [label for flag, label in _INDICATOR_LABELS if getattr(item, flag)]
 
-    if item.description:
-        text += f"  {item.description}\n"
+    flags = f" [{', '.join(indicators)}]" if indicators else ""
+    description = f"  {item.description}\n" if item.description else ""
 
-    return text
+    return f"• Item Id: {item.id} - {item.name} - ${item.price:.2f}{number}{flags}\n{description}"
@@ -3,9 +3,11 @@ Common utilities for context building
 """
 
 from typing import Optional, Callable, Any
-from sqlalchemy.orm import Session
+from sqlalchemy import exists
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.exc import SQLAlchemyError
 
-from app.models import Order
+from app.models import Agent, Conversation, Order
 from app.utils.logging_config import app_logger
 
 
@@ -13,41 +15,37 @@ def safe_execute(operation: Callable, error_message: str, fallback: Any = None)
     """Safely execute an operation with error handling"""
     try:
         return operation()
-    except Exception as e:
-        app_logger.error(f"{error_message}: {str(e)}")
+    except SQLAlchemyError:
+        app_logger.exception(error_message)
         return fallback
 
 
-def get_phone_from_conversation(db_session: Session, conversation_id: str) -> Optional[str]:
-    """Extract phone number from conversation record"""
-    def _get_phone():
-        from app.models import Conversation
-        conversation = (
+def get_conversation_with_order(db_session: Session, conversation_id: str) -> Optional[Conversation]:
+    """Load a conversation together with its orders and order items in one query"""
+    def _get_conversation():
+        return (
             db_session.query(Conversation)
+            .options(joinedload(Conversation.orders).joinedload(Order.order_items))
             .filter(Conversation.id == conversation_id)
             .first()
         )
-        return conversation.caller_phone if conversation else None
 
     return safe_execute(
-        _get_phone,
-        "Error getting phone from conversation",
+        _get_conversation,
+        "Error getting conversation with order",
         None
     )
 
 
-def get_current_order_id(db_session: Session, conversation_id: str) -> Optional[str]:
-    """Get current order ID associated with the conversation"""
-    def _get_order_id():
-        order = (
-            db_session.query(Order)
-            .filter(Order.conversation_id == conversation_id)
-            .first()
-        )
-        return order.id if order else None
+def get_current_order(conversation: Optional[Conversation]) -> Optional[Order]:
+    """Get the order associated with an eager-loaded conversation"""
+    if not conversation or not conversation.orders:
+        return None
+    return conversation.orders[0]
 
-    return safe_execute(
-        _get_order_id,
-        "Error getting current order ID",
-        None
-    )
+
+def agent_exists(db_session: Session, agent_id: str) -> bool:
+    """Check that an active agent exists without loading its row"""
+    return db_session.query(
+        exists().where(Agent.id == agent_id, Agent.active == True)
+    ).scalar()
@@ -2,118 +2,160 @@
 History context builder utilities
 """
 
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Optional
-from sqlalchemy import and_, desc
+from typing import Dict, Optional
+from sqlalchemy import Float, String, Text, and_, cast, desc, literal, null, select, union_all
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
 
-from app.models import Conversation, Order
+from app.models import Conversation, Order, OrderItem
+from app.models.database import ConversationType
+from app.utils.context_utils import get_current_order
 from app.utils.logging_config import app_logger
-from app.utils.context_formatters import format_conversation_item, format_order_item
+from app.utils.context_formatters import (
+    format_conversation_item,
+    format_order_item,
+    format_current_order_context,
+)
 
 
-def build_historical_conversations(
+def build_caller_history(
     db_session: Session,
     agent_id: str,
     phone_number: str,
     lookback_days: int,
     exclude_conversation_id: Optional[str] = None,
+    exclude_order_id: Optional[str] = None,
+    include_orders: bool = True,
     limit: int = 3,
-) -> str:
-    """Build historical conversation context"""
+) -> Dict[str, str]:
+    """Build historical conversation and order context in a single round-trip"""
+    history = {"historical_conversations": "", "historical_orders": ""}
+
     try:
-        cutoff_date = datetime.now() - timedelta(days=lookback_days)
-
-        query = (
-            db_session.query(Conversation)
-            .filter(
-                and_(
-                    Conversation.agent_id == agent_id,
-                    Conversation.caller_phone == phone_number,
-                    Conversation.created_at >= cutoff_date,
-                    Conversation.summary.isnot(None),
-                    Conversation.summary != "",
-                )
+        now = datetime.now()
+        cutoff_date = now - timedelta(days=lookback_days)
+
+        conversation_filters = [
+            Conversation.agent_id == agent_id,
+            Conversation.caller_phone == phone_number,
+            Conversation.created_at >= cutoff_date,
+            Conversation.summary.isnot(None),
+            Conversation.summary != "",
+        ]
+        if exclude_conversation_id:
+            conversation_filters.append(Conversation.id != exclude_conversation_id)
+
+        # Each arm is filtered, ordered and limited on its own so both stay index range scans
+        arms = [
+            select(
+                literal("conversation").label("kind"),
+                Conversation.id,
+                Conversation.created_at,
+                Conversation.summary,
+                Conversation.conversation_type,
+                cast(null(), Float).label("total_price"),
+                cast(null(), String).label("status"),
             )
+            .where(and_(*conversation_filters))
             .order_by(desc(Conversation.created_at))
-        )
-
-        if exclude_conversation_id:
-            query = query.filter(Conversation.id != exclude_conversation_id)
-
-        conversations = query.limit(limit).all()
+            .limit(limit)
+            .subquery()
+        ]
 
-        if not conversations:
-            return "No historical conversation context available"
+        if include_orders:
+            order_filters = [
+                Order.agent_id == agent_id,
+                Order.customer_phone == phone_number,
+                Order.created_at >= cutoff_date,
+                Order.active == True,
+            ]
+            if exclude_order_id:
+                order_filters.append(Order.id != exclude_order_id)
+
+            arms.append(
+                select(
+                    literal("order").label("kind"),
+                    Order.id,
+                    Order.created_at,
+                    cast(null(), Text).label("summary"),
+                    # Must match the conversation arm's native enum type for the UNION
+                    cast(null(), ConversationType).label("conversation_type"),
+                    Order.total_price,
+                    Order.status,
+                )
+                .where(and_(*order_filters))
+                .order_by(desc(Order.created_at))
+                .limit(limit)
+                .subquery()
+            )
 
-        history_text = f"HISTORICAL CONVERSATIONS (last {len(conversations)}):\n"
-        for i, conv in enumerate(conversations, 1):
-            history_text += format_conversation_item(conv, i)
+        selects = [select(arm) for arm in arms]
+        statement = union_all(*selects) if len(selects) > 1 else selects[0]
+        rows = db_session.execute(statement).all()
 
-        return history_text
+        conversations = sorted(
+            (row for row in rows if row.kind == "conversation"),
+            key=lambda row: row.created_at,
+            reverse=True,
+        )
+        orders = sorted(
+            (row for row in rows if row.kind == "order"),
+            key=lambda row: row.created_at,
+            reverse=True,
+        )
 
-    except Exception as e:
-        app_logger.error(f"Error building historical conversation context: {str(e)}")
-        return "Error retrieving historical conversation context"
+        if conversations:
+            history_parts = [f"HISTORICAL CONVERSATIONS (last {len(conversations)}):\n"]
+            history_parts.extend(
+                format_conversation_item(conv, i, now) for i, conv in enumerate(conversations, 1)
+            )
+            history["historical_conversations"] = "".join(history_parts)
+        else:
+            history["historical_conversations"] = "No historical conversation context available"
 
+        if include_orders:
+            history["historical_orders"] = _format_order_history(db_session, orders, now)
 
-def build_historical_orders(
-    db_session: Session,
-    agent_id: str,
-    phone_number: str,
-    lookback_days: int,
-    exclude_order_id: Optional[str] = None,
-    limit: int = 3,
-) -> str:
-    """Build historical order context"""
-    try:
-        cutoff_date = datetime.now() - timedelta(days=lookback_days)
-
-        query = (
-            db_session.query(Order)
-            .filter(
-                and_(
-                    Order.agent_id == agent_id,
-                    Order.customer_phone == phone_number,
-                    Order.created_at >= cutoff_date,
-                    Order.active == True,
-                )
-            )
-            .order_by(desc(Order.created_at))
-        )
+    except (SQLAlchemyError, ValueError, TypeError, KeyError):
+        app_logger.exception("Error building caller history context")
+        history["historical_conversations"] = "Error retrieving historical conversation context"
+        if include_orders:
+            history["historical_orders"] = "ORDER HISTORY: Error retrieving order history"
 
-        if exclude_order_id:
-            query = query.filter(Order.id != exclude_order_id)
+    return history
 
-        orders = query.limit(limit).all()
 
-        if not orders:
-            return "ORDER HISTORY: No previous orders"
+def _format_order_history(db_session: Session, orders: list, now: datetime) -> str:
+    """Format order history rows, loading all of their items in one query"""
+    if not orders:
+        return "ORDER HISTORY: No previous orders"
 
-        history_text = f"ORDER HISTORY (last {len(orders)} orders):\n"
-        for i, order in enumerate(orders, 1):
-            history_text += format_order_item(order, i)
+    items_by_order = defaultdict(list)
+    for item in (
+        db_session.query(OrderItem)
+        .with_entities(OrderItem.order_id, OrderItem.quantity, OrderItem.name, OrderItem.price)
+        .filter(OrderItem.order_id.in_([order.id for order in orders]))
+        .order_by(OrderItem.id)
+        .all()
+    ):
+        items_by_order[item.order_id].append(item)
 
-        return history_text
+    history_parts = [f"ORDER HISTORY (last {len(orders)} orders):\n"]
+    history_parts.extend(
+        format_order_item(order, i, items_by_order[order.id], now)
+        for i, order in enumerate(orders, 1)
+    )
 
-    except Exception as e:
-        app_logger.error(f"Error building order history: {str(e)}")
-        return "ORDER HISTORY: Error retrieving order history"
+    return "".join(history_parts)
 
 
-def build_current_conversation_context(
-    db_session: Session, conversation_id: str
-) -> tuple[str, Optional[str]]:
-    """Build current conversation context and extract phone number"""
+def build_current_conversation_context(conversation: Optional[Conversation]) -> str:
+    """Build current conversation context from a conversation loaded with its order"""
     try:
-        conversation = (
-            db_session.query(Conversation)
-            .filter(Conversation.id == conversation_id)
-            .first()
-        )
-
         if not conversation:
-            return "No current conversation context available", None
+            return "No current conversation context available"
 
         context_parts = [
             "CURRENT CONVERSATION:",
@@ -121,15 +163,10 @@ def build_current_conversation_context(
             f"- The Customer Phone Number is (don't ask for it), use this one: {conversation.caller_phone}",
         ]
 
-        # Find associated order
-        order = (
-            db_session.query(Order)
-            .filter(Order.conversation_id == conversation.id)
-            .first()
-        )
+        # Associated order is eager-loaded with the conversation
+        order = get_current_order(conversation)
 
         if order:
-            from app.utils.context_formatters import format_current_order_context
             context_parts.append("")
             context_parts.append(format_current_order_context(order))
         else:
@@ -141,8 +178,8 @@ def build_current_conversation_context(
                 "- Check with order management if needed",
             ])
 
-        return "\n".join(context_parts), str(conversation.caller_phone)
+        return "\n".join(context_parts)
 
     except Exception as e:
         app_logger.error(f"Error building current conversation context: {str(e)}")
-        return "Error retrieving current conversation context", None
+        return "Error retrieving current conversation context"
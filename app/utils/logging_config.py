@@ -1,4 +1,7 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from typing import Dict, Any, Optional
 
@@ -24,8 +27,16 @@ def setup_logging() -> logging.Logger:
     )
     console_handler.setFormatter(formatter)
 
+    # Hand records to a background thread so request handlers never block on stdout
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        log_queue, console_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+
     # Add handler to logger
-    logger.addHandler(console_handler)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
 
     return logger
 
@@ -4,6 +4,7 @@ Memory context builder utility for agent memories
 
 from typing import Optional, List
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.models import Agent
 from app.services.memory_service import MemoryService
@@ -34,7 +35,8 @@ def build_memory_context(
             db_session,
             agent_id=agent.id,
             importance_threshold=0.7,
-            limit=3
+            limit=3,
+            as_rows=True
         )
 
         # Get recent relevant memories
@@ -42,7 +44,8 @@ def build_memory_context(
             db_session,
             agent_id=agent.id,
             limit=limit,
-            update_last_used=True
+            update_last_used=True,
+            as_rows=True
         )
 
         # Get conversation-specific memories if we have a conversation_id
@@ -50,7 +53,8 @@ def build_memory_context(
         if conversation_id:
             conversation_memories = MemoryService.get_memories_by_conversation(
                 db_session,
-                conversation_id
+                conversation_id,
+                as_rows=True
             )
 
         # Combine and deduplicate memories
@@ -121,8 +125,8 @@ def build_memory_context(
 
         return "\n".join(context_parts)
 
-    except Exception as e:
-        app_logger.error(f"Error building memory context for agent {agent.id}: {str(e)}")
+    except (SQLAlchemyError, ValueError, TypeError, KeyError):
+        app_logger.exception(f"Error building memory context for agent {agent.id}")
         return "AGENT MEMORIES: Error retrieving memories"
 
 
@@ -152,7 +156,8 @@ def build_memory_context_by_type(
                 db_session,
                 agent_id=agent.id,
                 memory_type=memory_type,
-                limit=limit_per_type
+                limit=limit_per_type,
+                as_rows=True
             )
 
             if memories:
@@ -164,8 +169,8 @@ def build_memory_context_by_type(
 
         return "\n".join(context_parts) if context_parts else ""
 
-    except Exception as e:
-        app_logger.error(f"Error building typed memory context for agent {agent.id}: {str(e)}")
+    except (SQLAlchemyError, ValueError, TypeError, KeyError):
+        app_logger.exception(f"Error building typed memory context for agent {agent.id}")
         return ""
 
 
@@ -186,7 +191,8 @@ def build_rules_and_lessons_context(db_session: Session, agent: Agent) -> str:
             db_session,
             agent_id=agent.id,
             memory_type="rule",
-            limit=10  # More rules since they're critical
+            limit=10,  # More rules since they're critical
+            as_rows=True
         )
 
         # Get important lessons
@@ -194,7 +200,8 @@ def build_rules_and_lessons_context(db_session: Session, agent: Agent) -> str:
             db_session,
             agent_id=agent.id,
             memory_type="lesson",
-            limit=5
+            limit=5,
+            as_rows=True
         )
 
         if not rules and not lessons:
@@ -215,8 +222,8 @@ def build_rules_and_lessons_context(db_session: Session, agent: Agent) -> str:
 
         return "\n".join(context_parts)
 
-    except Exception as e:
-        app_logger.error(f"Error building rules/lessons context for agent {agent.id}: {str(e)}")
+    except (SQLAlchemyError, ValueError, TypeError, KeyError):
+        app_logger.exception(f"Error building rules/lessons context for agent {agent.id}")
         return ""
 
 
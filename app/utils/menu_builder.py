@@ -2,51 +2,88 @@
 Menu context builder utility
 """
 
+from collections import defaultdict
+
+from sqlalchemy import bindparam, func, select
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.models import Agent, MenuItem
 from app.utils.logging_config import app_logger
 from app.utils.context_formatters import format_menu_item
+from app.utils.ttl_cache import TTLCache
+
+# Rendered menu text keyed on (agent_id, menu version); shared across sessions
+_menu_context_cache = TTLCache(maxsize=512, ttl=300)
+
+# Statements are built once so SQLAlchemy reuses their compiled form
+_MENU_VERSION_QUERY = select(func.max(MenuItem.updated_at), func.count(MenuItem.id)).where(
+    MenuItem.agent_id == bindparam("agent_id")
+)
+
+# Only the columns format_menu_item reads, returned as plain rows
+_MENU_ITEMS_QUERY = (
+    select(
+        MenuItem.id,
+        MenuItem.name,
+        MenuItem.price,
+        MenuItem.number,
+        MenuItem.category,
+        MenuItem.description,
+        MenuItem.is_popular,
+        MenuItem.is_special,
+        MenuItem.is_new,
+        MenuItem.is_limited_time,
+    )
+    .where(
+        MenuItem.agent_id == bindparam("agent_id"),
+        MenuItem.active == True,
+        MenuItem.available == True,
+        MenuItem.is_hidden == False,
+    )
+    .order_by(MenuItem.category, MenuItem.name)
+)
+
+
+def get_menu_version(db_session: Session, agent_id: str) -> tuple:
+    """Cheap version key for an agent's menu: latest update time and row count"""
+    return tuple(db_session.execute(_MENU_VERSION_QUERY, {"agent_id": agent_id}).one())
 
 
 def build_menu_context(db_session: Session, agent: Agent) -> str:
     """Build current menu items context"""
-    if not getattr(agent, 'ordering_enabled', True):
+    if not agent.ordering_enabled:
         return ""
 
     try:
-        menu_items = (
-            db_session.query(MenuItem)
-            .filter(
-                MenuItem.agent_id == agent.id,
-                MenuItem.active == True,
-                MenuItem.available == True,
-                MenuItem.is_hidden == False,
-            )
-            .order_by(MenuItem.category, MenuItem.name)
-            .all()
-        )
+        cache_key = (agent.id, *get_menu_version(db_session, agent.id))
+        cached = _menu_context_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        menu_items = db_session.execute(_MENU_ITEMS_QUERY, {"agent_id": agent.id}).all()
 
         if not menu_items:
-            return "MENU: No items available"
+            menu_text = "MENU: No items available"
+            _menu_context_cache.set(cache_key, menu_text)
+            return menu_text
 
-        # Group by category
-        categories = {}
+        # Group by category (rows arrive ordered by category, so insertion order is kept)
+        categories = defaultdict(list)
         for item in menu_items:
-            if item.category not in categories:
-                categories[item.category] = []
             categories[item.category].append(item)
 
-        menu_text = f"CURRENT MENU ({len(menu_items)} items):\n"
+        menu_parts = [f"CURRENT MENU ({len(menu_items)} items):\n"]
 
         for category, items in categories.items():
-            menu_text += f"\n{category.upper()}:\n"
-            for item in items:
-                menu_text += format_menu_item(item)
+            menu_parts.append(f"\n{category.upper()}:\n")
+            menu_parts.extend(format_menu_item(item) for item in items)
 
-        menu_text += "\nIMPORTANT: Only offer items from this menu. Never suggest unavailable items."
+        menu_parts.append("\nIMPORTANT: Only offer items from this menu. Never suggest unavailable items.")
+        menu_text = "".join(menu_parts)
+        _menu_context_cache.set(cache_key, menu_text)
         return menu_text
 
-    except Exception as e:
-        app_logger.error(f"Error building menu context: {str(e)}")
+    except (SQLAlchemyError, ValueError, TypeError, KeyError):
+        app_logger.exception("Error building menu context")
         return "MENU: Temporarily unavailable"
@@ -5,11 +5,20 @@ Provides functions to get current time, check business hours, and format dates
 in the agent's local timezone for better contextual awareness.
 """
 
+import json
+import time
 from datetime import datetime
 from typing import Dict, Any, Optional, Tuple
 import pytz
 
 from app.utils.logging_config import app_logger as logger
+from app.utils.ttl_cache import TTLCache
+
+# Time contexts only render to minute precision, so one entry per minute is exact
+_time_context_cache = TTLCache(maxsize=256, ttl=60)
+
+# Business hours keys indexed by datetime.weekday()
+_DAY_KEYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
 
 
 def get_agent_timezone(agent_timezone: str) -> pytz.BaseTzInfo:
@@ -60,10 +69,10 @@ def is_within_business_hours(
 ) -> bool:
     """Check if current time is within business hours"""
     try:
-        day_name, current_time_str, _ = get_current_day_and_time(agent_timezone)
+        now = get_current_time_for_agent(agent_timezone)
 
         # Get business hours for current day
-        day_hours = business_hours.get(day_name, {})
+        day_hours = business_hours.get(_DAY_KEYS[now.weekday()], {})
 
         if not day_hours.get("enabled", False):
             return False
@@ -74,8 +83,8 @@ def is_within_business_hours(
         if not open_time or not close_time:
             return False
 
-        # Parse times
-        current_time = datetime.strptime(current_time_str, "%H:%M").time()
+        # Parse times; compare at minute precision like the configured hours
+        current_time = now.time().replace(second=0, microsecond=0)
         open_time_obj = datetime.strptime(open_time, "%H:%M").time()
         close_time_obj = datetime.strptime(close_time, "%H:%M").time()
 
@@ -163,7 +172,27 @@ def get_next_opening_time(
 def build_time_context_for_agent(
     agent_timezone: str, business_hours: Dict[str, Any]
 ) -> Dict[str, Any]:
-    """Build comprehensive time context for agent configuration"""
+    """Build comprehensive time context for agent configuration.
+
+    Results are cached per timezone, business hours and wall-clock minute;
+    treat the returned dict as read-only.
+    """
+    cache_key = (
+        agent_timezone,
+        json.dumps(business_hours, sort_keys=True, default=str),
+        int(time.time() // 60),
+    )
+    context = _time_context_cache.get(cache_key)
+    if context is None:
+        context = _build_time_context(agent_timezone, business_hours)
+        _time_context_cache.set(cache_key, context)
+    return context
+
+
+def _build_time_context(
+    agent_timezone: str, business_hours: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Compute the time context from the current clock"""
     business_status = get_business_status(agent_timezone, business_hours)
 
     context = {
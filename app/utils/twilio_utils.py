@@ -80,12 +80,14 @@ def create_twilio_conversation(
         else f"SMS from {from_number}"
     )
 
+    # Voice calls start with an empty order so order tools have one to work on
     conversation = conversation_service.create_conversation(
         agent_id=agent_id,
         caller_phone=from_number,
         conversation_type=conversation_type,
         twilio_sid=call_sid,
         session_name=session_name,
+        create_preemptive_order=conversation_type == "voice",
     )
 
     return conversation
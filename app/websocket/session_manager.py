@@ -7,10 +7,10 @@ between Twilio and Deepgram for voice-based AI agent conversations.
 
 import asyncio
 import base64
-import json
 from enum import Enum
 from typing import Optional, List, Dict, Any
 
+import orjson
 from fastapi import WebSocket
 from sqlalchemy.orm import Session
 
@@ -18,6 +18,7 @@ from app.models import Agent, Conversation
 from app.services.agent_service import AgentService
 from app.services.conversation_service import ConversationService
 from app.services.deepgram_service import DeepgramService
+from app.services.message_writer import message_writer
 from app.utils.logging_config import app_logger as logger
 
 
@@ -75,8 +76,13 @@ class WebSocketSession:
         try:
             logger.info(f"[SESSION] Setting up session for agent {self.agent_id}")
 
+            # Database work runs in a worker thread so call setup never stalls
+            # audio for other live sessions; the session is still used sequentially
+
             # 1. Validate agent
-            self.agent = self.agent_service.get_agent_by_id(self.agent_id)
+            self.agent = await asyncio.to_thread(
+                self.agent_service.get_agent_by_id, self.agent_id
+            )
             if not self.agent:
                 logger.error(f"[SESSION] Agent {self.agent_id} not found or inactive")
                 await self.websocket.close(code=1008, reason="Business not available")
@@ -87,8 +93,8 @@ class WebSocketSession:
             )
 
             # 2. Validate conversation
-            self.conversation = self.conversation_service.get_conversation(
-                self.conversation_id
+            self.conversation = await asyncio.to_thread(
+                self.conversation_service.get_conversation, self.conversation_id
             )
             if not self.conversation:
                 logger.error(f"[SESSION] Conversation {self.conversation_id} not found")
@@ -98,7 +104,8 @@ class WebSocketSession:
             logger.info(f"[SESSION] Using conversation: {self.conversation.id}")
 
             # 3. Build agent configuration
-            self.agent_config = self.agent_service.build_agent_config(
+            self.agent_config = await asyncio.to_thread(
+                self.agent_service.build_agent_config,
                 agent=self.agent,
                 phone_number=self.conversation.caller_phone,
                 conversation_id=self.conversation.id,
@@ -197,9 +204,10 @@ class WebSocketSession:
         if self.twilio_handler:
             await self.twilio_handler.cleanup()
 
-        # End conversation
+        # End conversation once its queued transcript messages are written
         try:
             if self.conversation:
+                await message_writer.flush()
                 await self.conversation_service.end_conversation(self.conversation.id)
                 logger.info(f"[SESSION] Ended conversation: {self.conversation.id}")
         except Exception as cleanup_error:
@@ -279,7 +287,7 @@ class AudioProcessor:
                             break
                         else:
                             logger.debug(
-                                f"[AUDIO] Connection state OK: {current_state}"
+                                "[AUDIO] Connection state OK: %s", current_state
                             )
                     except AttributeError as attr_error:
                         logger.debug(
@@ -342,7 +350,7 @@ class DeepgramHandler:
 
             # Print the agent config being sent for debugging
             logger.info(
-                f"[DEEPGRAM] Agent config: {json.dumps(self.agent_config, indent=2)}"
+                f"[DEEPGRAM] Agent config: {self.deepgram_service.config_payload}"
             )
 
             # Don't use context manager here - we need to keep the connection open
@@ -426,7 +434,7 @@ class DeepgramHandler:
     async def _handle_text_message(self, message: str):
         """Handle text messages from Deepgram"""
         try:
-            data = json.loads(message)
+            data = orjson.loads(message)
             event_type = data.get("type")
 
             logger.debug(f"[DEEPGRAM] Received {event_type} message")
@@ -438,7 +446,7 @@ class DeepgramHandler:
             else:
                 await self._handle_other_event(data)
 
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             logger.error(f"[DEEPGRAM] Invalid JSON received: {message[:100]}...")
         except Exception as e:
             logger.exception(f"[DEEPGRAM] Error handling text message: {e}")
@@ -537,7 +545,7 @@ class TwilioHandler:
             while self.is_running:
                 try:
                     message = await self.websocket.receive_text()
-                    data = json.loads(message)
+                    data = orjson.loads(message)
 
                     event_type = data.get("event")
 
@@ -550,7 +558,7 @@ class TwilioHandler:
                     else:
                         logger.debug(f"[TWILIO] Unhandled event type: {event_type}")
 
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     logger.warning("[TWILIO] Invalid JSON received from Twilio")
                     continue
                 except Exception as msg_error:
@@ -635,8 +643,8 @@ class TwilioHandler:
             self.audio_processor.put_stream_sid_back(stream_sid)
 
             # Send with additional error handling for closed connections
-            await self.websocket.send_text(json.dumps(media_message))
-            logger.debug(f"[TWILIO] Successfully sent {len(audio_data)} bytes of audio")
+            await self.websocket.send_text(orjson.dumps(media_message).decode())
+            logger.debug("[TWILIO] Successfully sent %d bytes of audio", len(audio_data))
 
         except RuntimeError as e:
             if "close message has been sent" in str(e):
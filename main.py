@@ -20,8 +20,10 @@ from app.api.routers import (
 )
 from app.config.settings import settings
 from app.models import create_tables
+from app.models.database import engine
 from app.utils.logging_config import app_logger as logger
 from app.background_tasks import run_stale_conversation_cleanup
+from app.services.message_writer import message_writer
 
 load_dotenv(override=True)
 
@@ -40,9 +42,11 @@ async def lifespan(fapp: FastAPI):
     logger.info("📋 Multi-tenant schema ready:")
     logger.info("🎯 Platform ready for multi-tenant agent deployment!")
     logger.info("📖 API Docs: http://%s:%s/docs", settings.HOST, settings.PORT)
-    # Start the background task
+    # Start the background tasks
     asyncio.create_task(run_stale_conversation_cleanup())
+    message_writer.start()
     yield
+    await message_writer.stop()
 
 
 app = FastAPI(
@@ -82,6 +86,22 @@ async def health_check():
     return {"status": "healthy", "service": "rollwise-ai-agent"}
 
 
+# Database connection pool status
+@app.get("/health/db")
+async def db_health_check():
+    pool = engine.pool
+    return {
+        "status": "healthy",
+        "pool": {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "summary": pool.status(),
+        },
+    }
+
+
 # Root endpoint
 @app.get("/")
 async def root():
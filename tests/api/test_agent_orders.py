@@ -0,0 +1,73 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+if not os.environ.get("TEST_DATABASE_URL"):
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+pytest.importorskip("sqlalchemy")
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.api.routers.agent_orders import NEXT_CURSOR_HEADER, router  # noqa: E402
+from app.models import Conversation, Order, get_db  # noqa: E402
+
+
+def _date_range():
+    today = datetime.utcnow().date()
+    return {"start_date": str(today - timedelta(days=1)), "end_date": str(today)}
+
+
+@pytest.fixture
+def client(db_session):
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_db] = lambda: db_session
+    return TestClient(app)
+
+
+@pytest.fixture
+def order_ids(db_session, agent):
+    conversation = Conversation(
+        agent_id=agent.id,
+        session_name="Call with +15550000006",
+        conversation_type="voice",
+        caller_phone="+15550000006",
+    )
+    db_session.add(conversation)
+    db_session.flush()
+    now = datetime.utcnow()
+    orders = [
+        Order(
+            agent_id=agent.id,
+            conversation_id=conversation.id,
+            status="new",
+            total_price=10.0,
+            created_at=now - timedelta(minutes=minutes),
+        )
+        for minutes in range(5)
+    ]
+    db_session.add_all(orders)
+    db_session.commit()
+    return [order.id for order in orders]
+
+
+def test_listing_without_limit_returns_every_order(client, agent, order_ids):
+    response = client.get(f"/{agent.id}/orders", params=_date_range())
+
+    assert response.status_code == 200
+    assert [order["id"] for order in response.json()] == order_ids
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_listing_pages_with_limit_and_cursor(client, agent, order_ids):
+    first = client.get(f"/{agent.id}/orders", params={**_date_range(), "limit": 3})
+    assert [order["id"] for order in first.json()] == order_ids[:3]
+
+    second = client.get(
+        f"/{agent.id}/orders",
+        params={**_date_range(), "limit": 3, "cursor": first.headers[NEXT_CURSOR_HEADER]},
+    )
+    assert [order["id"] for order in second.json()] == order_ids[3:]
+    assert NEXT_CURSOR_HEADER not in second.headers
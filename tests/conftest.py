@@ -8,3 +8,56 @@ if ROOT not in sys.path:
 
 # Optional: set test-related environment variables
 os.environ.setdefault("ENV", "test")
+
+# Database-backed tests run against the Postgres named by TEST_DATABASE_URL and are
+# skipped without it. The app engine is built from DATABASE_URL at import time.
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def pg_engine():
+    """App engine pointed at a freshly created test schema"""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    sqlalchemy = pytest.importorskip("sqlalchemy")
+
+    from app.models.database import Base, MenuItem, engine
+
+    with engine.begin() as conn:
+        has_trgm = conn.execute(
+            sqlalchemy.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        ).scalar()
+        if has_trgm:
+            conn.execute(sqlalchemy.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    if not has_trgm:
+        # The search index needs pg_trgm; everything else can still be tested without it
+        MenuItem.__table__.indexes = {
+            index for index in MenuItem.__table__.indexes if index.name != "ix_menu_items_search_trgm"
+        }
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def db_session(pg_engine):
+    from app.models.database import SessionLocal
+
+    session = SessionLocal()
+    yield session
+    session.rollback()
+    session.close()
+
+
+@pytest.fixture
+def agent(db_session):
+    from app.models import Agent
+
+    agent = Agent(name="Test Agent", business_name="Test Business")
+    db_session.add(agent)
+    db_session.commit()
+    return agent
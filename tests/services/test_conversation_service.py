@@ -0,0 +1,45 @@
+import os
+import time
+
+import pytest
+
+if not os.environ.get("TEST_DATABASE_URL"):
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+pytest.importorskip("sqlalchemy")
+
+from app.models import Conversation  # noqa: E402
+from app.services.conversation_service import ConversationService  # noqa: E402
+
+
+def _create_conversation(db_session, agent, caller_phone="+15550000001"):
+    conversation = Conversation(
+        agent_id=agent.id,
+        session_name=f"Call with {caller_phone}",
+        conversation_type="voice",
+        caller_phone=caller_phone,
+    )
+    db_session.add(conversation)
+    db_session.commit()
+    return conversation.id
+
+
+def test_mark_conversation_ended_measures_wall_clock_in_open_transaction(db_session, agent):
+    conversation_id = _create_conversation(db_session, agent)
+    service = ConversationService(db_session)
+
+    # Like a live call: a read opens the transaction and nothing commits it
+    assert service.get_conversation(conversation_id) is not None
+    time.sleep(2)
+
+    assert service._mark_conversation_ended(conversation_id) is True
+
+    db_session.expire_all()
+    conversation = db_session.get(Conversation, conversation_id)
+    assert conversation.status == "completed"
+    assert conversation.duration_seconds >= 2
+    assert conversation.ended_at > conversation.started_at
+
+
+def test_mark_conversation_ended_unknown_id(db_session, pg_engine):
+    assert ConversationService(db_session)._mark_conversation_ended("missing") is False
+
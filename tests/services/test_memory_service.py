@@ -0,0 +1,27 @@
+import os
+
+import pytest
+
+if not os.environ.get("TEST_DATABASE_URL"):
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+pytest.importorskip("sqlalchemy")
+
+from app.models.database import Memory  # noqa: E402
+from app.services.memory_service import MemoryService  # noqa: E402
+
+
+def test_bulk_update_importance_skips_missing_and_inactive(db_session, agent):
+    kept = Memory(agent_id=agent.id, content="Prefers pickup at 6pm", importance=0.5)
+    retired = Memory(agent_id=agent.id, content="Old allergy note", importance=0.5, active=False)
+    db_session.add_all([kept, retired])
+    db_session.commit()
+    kept_id, retired_id = kept.id, retired.id
+
+    updated = MemoryService.bulk_update_importance(
+        db_session, {kept_id: 1.7, retired_id: 0.9, "missing-memory": 0.1}
+    )
+
+    assert updated == 1
+    db_session.expire_all()
+    assert db_session.get(Memory, kept_id).importance == 1.0
+    assert db_session.get(Memory, retired_id).importance == 0.5
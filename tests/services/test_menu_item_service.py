@@ -0,0 +1,24 @@
+import os
+
+import pytest
+
+if not os.environ.get("TEST_DATABASE_URL"):
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import inspect  # noqa: E402
+
+from app.api.schemas.menu_item import MenuItemCreate  # noqa: E402
+from app.services.menu_item_service import MenuItemService  # noqa: E402
+
+
+def test_create_menu_item_returns_inserted_state_without_reload(db_session, agent):
+    menu_item = MenuItemService.create_menu_item(
+        db_session,
+        agent.id,
+        MenuItemCreate(number="12", name="Margherita", category="Entree", price=11.5),
+    )
+
+    # Detached before commit, so reading it back never issues a refresh SELECT
+    assert inspect(menu_item).detached
+    assert (menu_item.number, menu_item.name, menu_item.price) == ("12", "Margherita", 11.5)
@@ -0,0 +1,73 @@
+import asyncio
+import os
+
+import pytest
+
+if not os.environ.get("TEST_DATABASE_URL"):
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+pytest.importorskip("sqlalchemy")
+
+from app.models import Conversation, Message  # noqa: E402
+from app.services.message_writer import MessageWriter  # noqa: E402
+
+
+def _create_conversation(db_session, agent, caller_phone):
+    conversation = Conversation(
+        agent_id=agent.id,
+        session_name=f"Call with {caller_phone}",
+        conversation_type="voice",
+        caller_phone=caller_phone,
+    )
+    db_session.add(conversation)
+    db_session.commit()
+    return conversation.id
+
+
+def _transcript(db_session, conversation_id):
+    db_session.expire_all()
+    return [
+        (message.sequence_number, message.role, message.content)
+        for message in db_session.query(Message)
+        .filter(Message.conversation_id == conversation_id)
+        .order_by(Message.sequence_number)
+    ]
+
+
+def test_failing_rows_do_not_discard_other_conversations(db_session, agent):
+    first_call = _create_conversation(db_session, agent, "+15550000003")
+    second_call = _create_conversation(db_session, agent, "+15550000004")
+
+    async def write_batch():
+        writer = MessageWriter(flush_interval=0.05)
+        writer.start()
+        futures = []
+        for conversation_id, role, content in (
+            (first_call, "user", "Hi, are you open?"),
+            (second_call, "user", "I'd like a burger"),
+            (first_call, "narrator", "not a valid role"),
+            ("missing-conversation", "user", "lost call"),
+            (first_call, "assistant", "Yes, until 9pm."),
+            (second_call, "assistant", "One burger, coming up."),
+        ):
+            _, written = await writer.enqueue(conversation_id, role, content)
+            futures.append(written)
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        await writer.stop()
+        return results
+
+    results = asyncio.run(write_batch())
+
+    assert isinstance(results[2], Exception)
+    assert isinstance(results[3], Exception)
+    assert not any(isinstance(results[i], Exception) for i in (0, 1, 4, 5))
+
+    first = _transcript(db_session, first_call)
+    assert [(role, content) for _, role, content in first] == [
+        ("user", "Hi, are you open?"),
+        ("assistant", "Yes, until 9pm."),
+    ]
+    assert [sequence for sequence, _, _ in first] == sorted(results[i] for i in (0, 4))
+    assert _transcript(db_session, second_call) == [
+        (1, "user", "I'd like a burger"),
+        (2, "assistant", "One burger, coming up."),
+    ]
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+if not os.environ.get("TEST_DATABASE_URL"):
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+pytest.importorskip("sqlalchemy")
+
+from app.models import Conversation, Order, OrderItem  # noqa: E402
+from app.utils.history_builders import build_caller_history  # noqa: E402
+
+
+def test_build_caller_history_combines_conversations_and_orders(db_session, agent):
+    caller_phone = "+15550000002"
+    conversation = Conversation(
+        agent_id=agent.id,
+        session_name=f"Call with {caller_phone}",
+        conversation_type="voice",
+        caller_phone=caller_phone,
+        summary="Asked about opening hours",
+    )
+    db_session.add(conversation)
+    db_session.flush()
+    order = Order(
+        agent_id=agent.id,
+        conversation_id=conversation.id,
+        customer_phone=caller_phone,
+        status="completed",
+        total_price=12.5,
+    )
+    db_session.add(order)
+    db_session.flush()
+    db_session.add(OrderItem(order_id=order.id, name="Burger", quantity=1, price=12.5))
+    db_session.commit()
+
+    history = build_caller_history(db_session, agent.id, caller_phone, lookback_days=30)
+
+    assert "Asked about opening hours" in history["historical_conversations"]
+    assert "Type: voice" in history["historical_conversations"]
+    assert history["historical_orders"].startswith("ORDER HISTORY (last 1 orders)")
+    assert "1x Burger" in history["historical_orders"]
@@ -0,0 +1,41 @@
+from app.utils.ttl_cache import TTLCache
+
+
+def test_get_returns_stored_value():
+    cache = TTLCache(maxsize=4, ttl=60)
+    cache.set("menu", "CURRENT MENU")
+    assert cache.get("menu") == "CURRENT MENU"
+    assert "menu" in cache
+
+
+def test_get_missing_returns_default():
+    cache = TTLCache(maxsize=4, ttl=60)
+    assert cache.get("missing") is None
+    assert cache.get("missing", "fallback") == "fallback"
+
+
+def test_expired_entries_are_dropped():
+    cache = TTLCache(maxsize=4, ttl=0)
+    cache.set("menu", "CURRENT MENU")
+    assert cache.get("menu") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+
+
+def test_pop_and_clear():
+    cache = TTLCache(maxsize=4, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.pop("a") == 1
+    assert cache.pop("a") is None
+    cache.clear()
+    assert len(cache) == 0